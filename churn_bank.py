@@ -4,9 +4,16 @@ import numpy as np
 import seaborn as sns
 import matplotlib as plt
 import statsmodels.api as sm
-from scipy.stats import chi2_contingency
+from scipy.stats import chi2 as chi2_distribution
 from scipy.stats import norm
 from datetime import datetime
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+import warnings
 
 
 # %% [markdown]
@@ -33,11 +40,308 @@ from datetime import datetime
 # %%
 import csv
 
-# menampilkan dataset
-df = pd.read_csv('Bank-Customer-Churn-Prediction.csv')
+SOURCE_CSV = 'Bank-Customer-Churn-Prediction.csv'
+
+# skema tipe data setiap kolom agar dataset tidak dimuat sebagai int64/float64/object default
+CHURN_SCHEMA = {
+    'customer_id': 'int64',
+    'credit_score': 'int16',
+    'country': pd.CategoricalDtype(['France', 'Germany', 'Spain']),
+    'gender': pd.CategoricalDtype(['Female', 'Male']),
+    'age': 'uint8',
+    'tenure': 'uint8',
+    'balance': 'float32',
+    'products_number': 'uint8',
+    'credit_card': 'uint8',
+    'active_member': 'uint8',
+    'estimated_salary': 'float32',
+    'churn': 'uint8'
+}
+
+def peak_rss_mb():
+    # puncak pemakaian memori proses (resident set size) dalam MB
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # macOS melaporkan dalam byte, Linux dalam kilobyte
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+# kolom integer yang memiliki nilai kosong tidak dapat dimuat sebagai uint8/int16; file dibaca dengan dtype nullable (UInt8, Int16, ...)
+CHURN_NULLABLE_SCHEMA = {col: dtype.replace('uint', 'UInt').replace('int', 'Int') if isinstance(dtype, str) and 'int' in dtype else dtype
+                         for col, dtype in CHURN_SCHEMA.items()}
+
+def read_schema(schema):
+    # kolom kategori dibaca dengan kategori hasil inferensi agar nilai yang tidak dikenal dapat dideteksi
+    return {col: 'category' if isinstance(dtype, pd.CategoricalDtype) else dtype for col, dtype in schema.items()}
+
+def conform_categories(frame):
+    # kategori disamakan dengan CHURN_SCHEMA; nilai di luar kategori (misalnya negara baru) menjadi NaN dengan peringatan
+    for col, dtype in CHURN_SCHEMA.items():
+        if isinstance(dtype, pd.CategoricalDtype) and col in frame:
+            unknown = frame[col].cat.categories.difference(dtype.categories)
+            if len(unknown):
+                warnings.warn(f'kolom {col} memiliki nilai di luar skema {list(unknown)}; nilai tersebut dimuat sebagai NaN')
+            frame[col] = frame[col].cat.set_categories(dtype.categories)
+    return frame
+
+def compact_integers(frame):
+    # kolom integer nullable tanpa nilai kosong dikembalikan ke dtype CHURN_SCHEMA (uint8, int16, ...)
+    has_missing = [col for col, dtype in CHURN_NULLABLE_SCHEMA.items()
+                   if dtype != CHURN_SCHEMA[col] and col in frame and frame[col].hasnans]
+    if has_missing:
+        warnings.warn(f'kolom integer {has_missing} memiliki nilai kosong; dimuat dengan dtype nullable')
+    return frame.astype({col: dtype for col, dtype in CHURN_SCHEMA.items()
+                         if CHURN_NULLABLE_SCHEMA[col] != dtype and col in frame and col not in has_missing})
+
+def iter_churn_chunks(path, chunksize=1_000_000):
+    # membaca csv per potongan (chunk) dengan skema yang sama sehingga file yang lebih besar dari memori tetap dapat diproses;
+    # setiap chunk dibaca dengan skema nullable lalu diperkecil ke CHURN_SCHEMA jika tidak ada nilai kosong
+    for chunk in pd.read_csv(path, dtype=read_schema(CHURN_NULLABLE_SCHEMA), chunksize=chunksize):
+        yield conform_categories(compact_integers(chunk))
+
+def load_churn_csv(path):
+    start = time.perf_counter()
+    data = conform_categories(compact_integers(pd.read_csv(path, dtype=read_schema(CHURN_NULLABLE_SCHEMA))))
+    elapsed = time.perf_counter() - start
+
+    # menampilkan kecepatan baca dan puncak memori
+    print(f'{len(data)} baris dibaca dalam {elapsed:.3f} detik '
+          f'({len(data) / elapsed:,.0f} baris/detik), peak RSS {peak_rss_mb():.1f} MB')
+    return data
+
+# %% [markdown]
+# `Instrumentasi tahap analisis (opsional)`
+# 
+# Setiap tahap utama (load, outlier, binning, agregasi, korelasi, regresi, chi-square, task graph, render grafik) dibungkus `traced()`. Secara default pembungkus ini langsung memanggil fungsinya tanpa overhead. Instrumentasi diaktifkan lewat variabel lingkungan:
+# - `CHURN_TRACE=trace.json`: Chrome trace (dapat dibuka di `chrome://tracing`, Perfetto atau speedscope sebagai flame graph). `CHURN_TRACE=trace.jsonl`: satu baris JSON per tahap, ditulis langsung saat tahap selesai.
+# - `CHURN_TRACE_MEMORY=1`: puncak alokasi per tahap dengan tracemalloc (lebih lambat).
+# - `CHURN_PROFILE_DIR=profiles`: dump cProfile (format pstats, bisa dibuka dengan snakeviz/flameprof) untuk setiap tahap tingkat atas.
+# - `CHURN_CHECKS=1`: menjalankan pengecekan yang membandingkan hasil dengan implementasi acuan (statsmodels, pandas). Secara default dilewati karena acuan tersebut memindai ulang seluruh data.
+# 
+# Setiap event mencatat durasi, jumlah baris masuk/keluar, perubahan RSS, puncak tracemalloc dan pid.
+
+# %%
+import atexit
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+
+TRACE_PATH = os.environ.get('CHURN_TRACE')
+TRACE_MEMORY = os.environ.get('CHURN_TRACE_MEMORY', '') not in ('', '0')
+PROFILE_DIR = os.environ.get('CHURN_PROFILE_DIR')
+TRACE_ENABLED = bool(TRACE_PATH or TRACE_MEMORY or PROFILE_DIR)
+CHECKS_ENABLED = os.environ.get('CHURN_CHECKS', '') not in ('', '0')
+BENCHMARK_ENABLED = os.environ.get('CHURN_BENCH', '') not in ('', '0')
+
+trace_events = []
+_trace_stack = []
+_trace_start = time.perf_counter()
+
+def current_rss_mb():
+    # RSS saat ini dari /proc (Linux); platform lain memakai puncak RSS
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+def row_count(value):
+    # jumlah baris untuk DataFrame/array, elemen pertama untuk tuple hasil (frame, ...), selain itu None
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)) else None
+
+def emit_trace_event(event):
+    trace_events.append(event)
+    # jsonl ditulis per event sehingga trace tetap ada walaupun proses berhenti di tengah
+    if TRACE_PATH and TRACE_PATH.endswith('.jsonl'):
+        with open(TRACE_PATH, 'a') as f:
+            f.write(json.dumps(event, default=str) + '\n')
+
+@contextmanager
+def trace_stage(name, rows_in=None, category='stage'):
+    # event berformat Chrome trace ('X' = complete event, waktu dalam mikrodetik); args dapat diisi pemanggil
+    event = {'name': name, 'cat': category, 'ph': 'X', 'pid': os.getpid(), 'tid': 0,
+             'ts': (time.perf_counter() - _trace_start) * 1e6,
+             'args': {'rows_in': rows_in, 'rss_before_mb': current_rss_mb()}}
+
+    # tracemalloc: puncak tahap induk disimpan dulu sebelum di-reset untuk tahap anak
+    if TRACE_MEMORY:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if _trace_stack:
+            _trace_stack[-1]['peak'] = max(_trace_stack[-1]['peak'], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    frame = {'peak': 0, 'traced_before': tracemalloc.get_traced_memory()[0] if TRACE_MEMORY else 0}
+
+    # cProfile tidak dapat bersarang, sehingga hanya tahap tingkat atas yang diprofil
+    profiler = cProfile.Profile() if PROFILE_DIR and not _trace_stack else None
+    _trace_stack.append(frame)
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield event
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profile_path = os.path.join(PROFILE_DIR, f'{len(trace_events):03d}_{name}.prof')
+            profiler.dump_stats(profile_path)
+            event['args']['profile'] = profile_path
+        _trace_stack.pop()
+        event['dur'] = (time.perf_counter() - _trace_start) * 1e6 - event['ts']
+        event['args']['rss_after_mb'] = current_rss_mb()
+        event['args']['rss_delta_mb'] = event['args']['rss_after_mb'] - event['args']['rss_before_mb']
+        if TRACE_MEMORY:
+            traced, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame['peak'])
+            event['args']['traced_delta_mb'] = (traced - frame['traced_before']) / 1024 ** 2
+            event['args']['traced_peak_mb'] = (peak - frame['traced_before']) / 1024 ** 2
+            if _trace_stack:
+                _trace_stack[-1]['peak'] = max(_trace_stack[-1]['peak'], peak)
+        emit_trace_event(event)
+
+def traced(name, fn, *args, **kwargs):
+    # memanggil fn(*args, **kwargs) sebagai satu tahap; baris masuk dari argumen pertama, baris keluar dari hasil
+    if not TRACE_ENABLED:
+        return fn(*args, **kwargs)
+    with trace_stage(name, rows_in=row_count(args[0]) if args else None) as event:
+        result = fn(*args, **kwargs)
+        event['args']['rows_out'] = row_count(result)
+    return result
+
+def trace_task_report(report, parent, category='task'):
+    # task yang berjalan di proses worker dicatat dari laporan waktunya, relatif terhadap awal tahap induk
+    for name, row in report.iterrows():
+        emit_trace_event({'name': name, 'cat': category, 'ph': 'X', 'pid': int(row['pid']), 'tid': 0,
+                          'ts': parent['ts'] + row['start'] * 1e6, 'dur': row['wall_time'] * 1e6,
+                          'args': {'critical_path': bool(row['critical_path'])}})
+
+def write_trace(path=TRACE_PATH):
+    # format Chrome trace (traceEvents); jsonl sudah ditulis per event
+    if not path or path.endswith('.jsonl'):
+        return
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f, default=str)
+
+def trace_summary(events=None):
+    # ringkasan per tahap: jumlah pemanggilan, total durasi (detik), baris dan memori
+    return pd.DataFrame([{'name': e['name'], 'cat': e['cat'], 'wall_time': e['dur'] / 1e6, **e['args']}
+                         for e in (trace_events if events is None else events)])
+
+if TRACE_PATH:
+    if TRACE_PATH.endswith('.jsonl') and os.path.exists(TRACE_PATH):
+        os.remove(TRACE_PATH)
+    atexit.register(write_trace)
+
+# %% [markdown]
+# `Cache dataset yang telah dibersihkan dan dibinning`
+
+# %%
+# definisi cleaning dan binning yang dipakai pipeline; perubahan nilai di sini otomatis membatalkan cache
+CLEANING_DEFINITIONS = {
+    'outlier_columns': ['credit_score', 'age', 'tenure', 'balance', 'products_number', 'credit_card', 'active_member', 'estimated_salary'],
+    'outlier_rule': 'iqr',
+    'outlier_k': 1.5,
+    'quantile_backend': 'exact'
+}
+
+# registry binning per fitur: strategi 'quantile' (frekuensi sama), 'equal_width' (lebar sama) atau 'edges' (batas eksplisit)
+# outputs: kolom hasil beserta jenis labelnya ('index' = nomor bin 1..k, 'range' = teks 'batas bawah - batas atas')
+BINNING_DEFINITIONS = {
+    'age': {
+        'strategy': 'quantile', 'q': 10, 'quantile_backend': 'exact',
+        'outputs': {'age_bins': 'index'}
+    },
+    'balance': {
+        'strategy': 'equal_width', 'bins': 10,
+        'label_format': '{:.0f}',
+        'outputs': {'balance_range': 'range', 'balance_bins': 'index'}
+    },
+    'credit_score': {
+        'strategy': 'equal_width', 'bins': 10,
+        'label_format': '{:.1f}',
+        'outputs': {'credit_score_range': 'range'}
+    }
+}
+
+CACHE_DIR = '.churn_cache'
+# dinaikkan setiap kali format kolom yang disimpan berubah; versi 2: kolom binning disimpan sebagai Categorical
+CACHE_VERSION = 2
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    # tanpa pyarrow cache dinonaktifkan dan pipeline selalu dihitung ulang
+    feather = None
+
+def schema_signature(schema):
+    # CategoricalDtype ditulis lengkap dengan kategorinya (str() hanya menghasilkan 'category')
+    return {col: {'categories': [str(value) for value in dtype.categories], 'ordered': bool(dtype.ordered)}
+                 if isinstance(dtype, pd.CategoricalDtype) else str(dtype)
+            for col, dtype in schema.items()}
+
+def churn_cache_key(path):
+    # kunci cache = hash isi file sumber + definisi skema, cleaning dan binning
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    definitions = {
+        'version': CACHE_VERSION,
+        'schema': schema_signature(CHURN_SCHEMA),
+        'cleaning': CLEANING_DEFINITIONS,
+        'binning': BINNING_DEFINITIONS
+    }
+    digest.update(json.dumps(definitions, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+def cache_path(key):
+    return os.path.join(CACHE_DIR, f'churn_clean_{key}.arrow')
+
+def binning_path(key):
+    return os.path.join(CACHE_DIR, f'churn_clean_{key}.binning.json')
+
+def load_cached_frame(key):
+    # membaca cache Arrow IPC dengan memory map sehingga data tidak perlu diparse ulang
+    path = cache_path(key)
+    if feather is None or not os.path.exists(path):
+        return None
+    start = time.perf_counter()
+    data = feather.read_table(path, memory_map=True).to_pandas()
+    print(f'cache {path} dibaca dalam {time.perf_counter() - start:.3f} detik')
+    return data
+
+def save_cached_frame(data, key):
+    if feather is None:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    # cache lama dengan kunci berbeda sudah tidak valid
+    for name in os.listdir(CACHE_DIR):
+        if name.startswith('churn_clean_') and name != os.path.basename(cache_path(key)):
+            os.remove(os.path.join(CACHE_DIR, name))
+
+    # tanpa kompresi agar file dapat di-memory map tanpa dekompresi
+    feather.write_feather(data, cache_path(key), compression='uncompressed')
+
+# menampilkan dataset (dari cache jika CSV dan definisi tidak berubah)
+cache_key = churn_cache_key(SOURCE_CSV)
+df = traced('load_cache', load_cached_frame, cache_key)
+cache_hit = df is not None
+if not cache_hit:
+    df = traced('load_csv', load_churn_csv, SOURCE_CSV)
 
 df.head(5)
 
+# %% [markdown]
+# Dataset dimuat dengan skema `CHURN_SCHEMA` sehingga kolom kategori (country, gender) disimpan sebagai categorical, kolom biner dan hitungan kecil sebagai uint8, serta balance/estimated_salary sebagai float32. File dibaca dengan dtype nullable (UInt8, Int16, ...) lalu kolom integer yang tidak memiliki nilai kosong diperkecil kembali ke dtype skema; kolom yang memiliki nilai kosong tetap nullable (dengan peringatan) dan barisnya dibuang pada tahap cleaning. Nilai country/gender di luar kategori skema dimuat sebagai NaN dengan peringatan. Untuk file yang lebih besar dari memori gunakan `iter_churn_chunks()` agar data diproses per potongan.
+# 
+# Hasil cleaning dan binning disimpan sebagai cache Arrow IPC di `.churn_cache/` dengan kunci hash isi CSV dan definisi cleaning/binning. Jika CSV dan definisi tidak berubah, dataset yang telah bersih dibaca langsung dari cache (memory map) dan langkah cleaning serta binning dilewati.
+
 # %%
 # menampilkan informasi dataset
 df.info()
@@ -50,74 +354,238 @@ df.info()
 
 # %%
 # Menghilangkan missing null
-df.isnull().sum()
+missing_counts = df.isnull().sum()
+if missing_counts.any():
+    # baris dengan nilai kosong (termasuk kategori di luar skema) dibuang lalu kolom dikembalikan ke dtype CHURN_SCHEMA
+    df = df.dropna().astype(CHURN_SCHEMA)
+missing_counts
 
 # %% [markdown]
 # Output di atas menunjukkan bahwa tidak ada data yagn kosong **(missing null)**
 
 # %%
+def row_hashes(frame, columns=None):
+    # hash 64-bit per baris (seluruh kolom atau columns); baris identik memiliki hash yang sama
+    return pd.util.hash_pandas_object(frame if columns is None else frame[columns], index=False).to_numpy()
+
+def duplicate_mask(frame, columns=None):
+    # duplikat dideteksi dari hash uint64, bukan perbandingan nilai object per kolom
+    return pd.Series(row_hashes(frame, columns)).duplicated().to_numpy()
+
 # mengecek duplikat dalam DataFrame
-duplicate_rows = df[df.duplicated()]
+if not cache_hit:
+    duplicate_rows = df[duplicate_mask(df)]
 
-# menampilkan hasil
-print("Baris duplikat:")
-print(duplicate_rows)
-print("Jumlah baris duplikat:", duplicate_rows.shape[0])
+    # menampilkan hasil
+    print("Baris duplikat:")
+    print(duplicate_rows)
+    print("Jumlah baris duplikat:", duplicate_rows.shape[0])
 
 # %% [markdown]
 # Output di atas menunjukkan tidak ada duplikasi data di setiap kolom dataframe
 
-# %%
-# mengecek outlier dalam DataFrame
-
-# menyiapkan quartile dari variabel yang akan dihitung
-Q_1 = df[['credit_score', 'age', 'tenure', 'balance', 'products_number', 'credit_card','active_member', 'estimated_salary']].quantile(0.25)
-Q_3 = df[['credit_score', 'age', 'tenure', 'balance', 'products_number', 'credit_card','active_member', 'estimated_salary']].quantile(0.75)
+# %% [markdown]
+# `Sketsa kuantil streaming`
+# 
+# Kuantil eksak (`.quantile()`, `pd.qcut`) membutuhkan seluruh kolom di memori. Untuk histori yang sangat besar, kuartil batas outlier dan rentang desil umur dapat dihitung dengan sketsa kuantil bergaya KLL: data dibaca satu kali per potongan, memori sketsa tetap (bergantung pada parameter `k`), dan sketsa dari beberapa partisi/worker dapat digabung (merge).
 
-# perhitungan interquartile pada variabel
-i_Q = Q_3 - Q_1
+# %%
+def kll_init(k=200, seed=0):
+    return {'k': k,
+            'n': 0,
+            'min': np.inf,
+            'max': -np.inf,
+            'levels': [np.empty(0)],
+            'rng': np.random.default_rng(seed)}
+
+def kll_capacity(sketch, level):
+    # kapasitas level menyusut secara geometris (2/3) untuk level yang lebih rendah
+    depth = len(sketch['levels']) - level - 1
+    return max(2, int(np.ceil(sketch['k'] * (2 / 3) ** depth)))
+
+def kll_compress(sketch):
+    levels = sketch['levels']
+    level = 0
+    while level < len(levels):
+        if len(levels[level]) > kll_capacity(sketch, level):
+            if level + 1 == len(levels):
+                levels.append(np.empty(0))
+            items = np.sort(levels[level])
+
+            # separuh item (posisi ganjil atau genap secara acak) naik ke level berikutnya dengan bobot dua kali lipat
+            odd = len(items) % 2
+            offset = sketch['rng'].integers(2)
+            levels[level + 1] = np.concatenate([levels[level + 1], items[odd + offset::2]])
+            levels[level] = items[:odd]
+        level += 1
+    return sketch
+
+def kll_update(sketch, values):
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if len(values):
+        sketch['n'] += len(values)
+        sketch['min'] = min(sketch['min'], values.min())
+        sketch['max'] = max(sketch['max'], values.max())
+        sketch['levels'][0] = np.concatenate([sketch['levels'][0], values])
+        kll_compress(sketch)
+    return sketch
+
+def kll_merge(a, b):
+    # menggabungkan dua sketsa dengan parameter k yang sama (misalnya dari partisi atau worker berbeda)
+    merged = kll_init(a['k'])
+    merged['n'] = a['n'] + b['n']
+    merged['min'] = min(a['min'], b['min'])
+    merged['max'] = max(a['max'], b['max'])
+    depth = max(len(a['levels']), len(b['levels']))
+    merged['levels'] = [np.concatenate([sketch['levels'][h] for sketch in (a, b) if h < len(sketch['levels'])])
+                        for h in range(depth)]
+    return kll_compress(merged)
+
+def kll_quantile(sketch, qs):
+    # item level h mewakili 2**h nilai asli
+    items = np.concatenate(sketch['levels'])
+    weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(sketch['levels'])])
+    order = np.argsort(items, kind='stable')
+    items, cum_weights = items[order], np.cumsum(weights[order])
+
+    qs = np.asarray(qs, dtype=np.float64)
+    idx = np.clip(np.searchsorted(cum_weights, qs * cum_weights[-1], side='left'), 0, len(items) - 1)
+    result = items[idx]
+
+    # nilai minimum dan maksimum disimpan eksak
+    return np.where(qs <= 0, sketch['min'], np.where(qs >= 1, sketch['max'], result))
+
+def kll_rank_error(k):
+    # perkiraan batas galat rank normalisasi (kepercayaan ~99%) untuk sketsa KLL dengan parameter k
+    return 2.296 / k ** 0.9723
+
+def sketch_quantiles(values, qs, k=200):
+    # kuantil per kolom dari matriks nilai (baris x variabel) menggunakan satu sketsa per kolom
+    values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+    return np.column_stack([kll_quantile(kll_update(kll_init(k), values[:, j]), qs) for j in range(values.shape[1])])
+
+def quantile_edges(values, q, backend='exact', k=200):
+    # batas rentang kuantil (seperti pd.qcut) dengan kuantil eksak atau sketsa
+    qs = np.linspace(0, 1, q + 1)
+    if backend == 'sketch':
+        edges = sketch_quantiles(values, qs, k)[:, 0]
+    else:
+        edges = np.nanquantile(np.asarray(values, dtype=np.float64), qs)
+    return np.unique(edges)
 
-# menentukan batas bawah dan batas atas pada variabel yang dihitung
-batas_bawah = Q_1 - 1.5 * i_Q
-batas_atas = Q_3 + 1.5 * i_Q
+# %%
+# mengecek outlier dalam DataFrame
 
-# menampilkan hasil perhitungan quartile
-print('Batas bawah:')
-print(batas_bawah)
-print('Batas atas:')
-print(batas_atas)
+# variabel numerik yang akan diperiksa outliernya
+outlier_columns = CLEANING_DEFINITIONS['outlier_columns']
+
+# aturan outlier menerima matriks nilai (baris x variabel) dan mengembalikan batas bawah dan batas atas per variabel
+def iqr_rule(values, k=1.5, backend='exact', sketch_k=200):
+    # menyiapkan quartile dari variabel yang akan dihitung (eksak atau dengan sketsa kuantil)
+    if backend == 'sketch':
+        Q_1, Q_3 = sketch_quantiles(values, [0.25, 0.75], sketch_k)
+    else:
+        Q_1, Q_3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+
+    # perhitungan interquartile pada variabel
+    i_Q = Q_3 - Q_1
+
+    # menentukan batas bawah dan batas atas pada variabel yang dihitung
+    return Q_1 - k * i_Q, Q_3 + k * i_Q
+
+def zscore_rule(values, k=3.0):
+    # batas berdasarkan rata-rata dan standar deviasi
+    mean = np.nanmean(values, axis=0)
+    std = np.nanstd(values, axis=0, ddof=1)
+    # variabel tanpa sebaran (std = 0) tidak diberi batas
+    std = np.where(std > 0, std, np.inf)
+    return mean - k * std, mean + k * std
+
+def mad_rule(values, k=3.5):
+    # batas berdasarkan median dan median absolute deviation (MAD) yang diskalakan ke standar deviasi
+    median = np.nanmedian(values, axis=0)
+    mad = 1.4826 * np.nanmedian(np.abs(values - median), axis=0)
+    # MAD = 0 (misalnya variabel biner atau jumlah produk) tidak diberi batas, bukan batas [median, median]
+    mad = np.where(mad > 0, mad, np.inf)
+    return median - k * mad, median + k * mad
+
+OUTLIER_RULES = {
+    'iqr': iqr_rule,
+    'zscore': zscore_rule,
+    'mad': mad_rule
+}
 
-# membuat perhitungan outlier pada setiap variabel
-outlier = df[(df[['credit_score',  'age', 'tenure', 'balance', 'products_number', 'credit_card','active_member', 'estimated_salary']] < batas_bawah) | (df[['credit_score', 'age', 'tenure', 'balance', 'products_number', 'credit_card','active_member', 'estimated_salary']] > batas_atas) ].any(axis = 1)
+def remove_outliers(df, columns, rule='iqr', **rule_kwargs):
+    # rule dapat berupa nama aturan pada OUTLIER_RULES atau fungsi dengan bentuk yang sama
+    rule_fn = rule if callable(rule) else OUTLIER_RULES[rule]
+
+    # mengambil seluruh variabel sebagai satu matriks numpy (sekali salin)
+    values = df[columns].to_numpy(dtype=np.float64)
+    batas_bawah, batas_atas = rule_fn(values, **rule_kwargs)
+
+    # broadcasting batas (1 x variabel) terhadap matriks nilai (baris x variabel)
+    is_outlier = (values < batas_bawah) | (values > batas_atas)
+    outlier = is_outlier.any(axis=1)
+
+    bounds = pd.DataFrame({'batas_bawah': batas_bawah, 'batas_atas': batas_atas}, index=columns)
+    outlier_counts = pd.Series(is_outlier.sum(axis=0), index=columns, name='jumlah_outlier')
+
+    # menghapus seluruh baris outlier dalam satu kali filter
+    return df[~outlier], outlier_counts, bounds
+
+def outlier_rule_kwargs(rule, definitions=CLEANING_DEFINITIONS):
+    # parameter dari definisi cleaning hanya diteruskan ke aturan yang mendeklarasikannya (backend hanya untuk iqr);
+    # outlier_k milik aturan yang dipilih, aturan lain memakai k bawaannya
+    rule_fn = rule if callable(rule) else OUTLIER_RULES[rule]
+    accepted = inspect.signature(rule_fn).parameters
+    options = {'backend': definitions['quantile_backend']}
+    if rule == definitions['outlier_rule']:
+        options['k'] = definitions['outlier_k']
+    return {name: value for name, value in options.items() if name in accepted}
+
+# menghitung batas outlier dan baris yang mengandung outlier sekaligus
+if not cache_hit:
+    df_clean, outlier_counts, outlier_bounds = traced('outlier_filter', remove_outliers, df, outlier_columns,
+                                                      rule=CLEANING_DEFINITIONS['outlier_rule'],
+                                                      **outlier_rule_kwargs(CLEANING_DEFINITIONS['outlier_rule']))
+    batas_bawah = outlier_bounds['batas_bawah']
+    batas_atas = outlier_bounds['batas_atas']
+
+    # menampilkan hasil perhitungan quartile
+    print('Batas bawah:')
+    print(batas_bawah)
+    print('Batas atas:')
+    print(batas_atas)
+
+    # menampilkan jumlah outlier pada setiap variabel
+    print('Jumlah outlier:')
+    print(outlier_counts)
 
 
 # %% [markdown]
 # Out di atas menujukkan informasi mengenai hasil perhitungan outlier pada setiap variabel 
 
 # %%
-# membuat looping untuk memeriksa dan menghapus baris yang mengandung outlier
-for index, row in df.iterrows():
-    
-    is_outlier = (row[['credit_score',
-                         'age', 
-                         'tenure', 
-                         'balance', 
-                         'products_number', 
-                         'credit_card','active_member', 
-                         'estimated_salary']] < batas_bawah) | (row[['credit_score',
-                                                                     'age',
-                                                                     'tenure', 
-                                                                     'balance', 
-                                                                     'products_number', 
-                                                                     'credit_card',
-                                                                     'active_member', 
-                                                                     'estimated_salary']] > batas_atas)
-    if is_outlier.any():
-
-        df = df.drop(index)
+# menghapus baris yang mengandung outlier (sudah difilter sekaligus tanpa looping per baris)
+if not cache_hit:
+    df = df_clean
 
 df
 
+# %%
+def streaming_iqr_bounds(chunks, columns, k=1.5, sketch_k=200):
+    # chunks: iterable DataFrame, misalnya iter_churn_chunks(path, chunksize) untuk file yang tidak muat di memori;
+    # setiap potongan menghasilkan sketsa sendiri (seperti partisi/worker) lalu digabung
+    sketches = None
+    for chunk in chunks:
+        chunk_sketches = [kll_update(kll_init(sketch_k), chunk[col]) for col in columns]
+        sketches = chunk_sketches if sketches is None else [kll_merge(a, b) for a, b in zip(sketches, chunk_sketches)]
+    Q_1, Q_3 = np.column_stack([kll_quantile(sketch, [0.25, 0.75]) for sketch in sketches])
+    i_Q = Q_3 - Q_1
+    return pd.DataFrame({'Q_1': Q_1, 'Q_3': Q_3, 'batas_bawah': Q_1 - k * i_Q, 'batas_atas': Q_3 + k * i_Q},
+                        index=columns)
+
 # %% [markdown]
 # Hasil menunjukkan bahwa data cleaning untuk baris yang memiliki value outlier akan dieliminasi untuk mendapatkan data yang akurat.
 
@@ -176,11 +644,69 @@ df['churn'].value_counts()
 # Pembuatan rentang umur [bins] dapat membantu dalam memahami dan menganalisis data untuk simplikasi data dan visualisasi yang lebih mudah serta mengidentifikasi pola.
 
 # %%
-# menggunakan qcut() untuk melakukan binning dengan frekuensi yang sama
-df['age_bins'] = pd.qcut(df['age'],
-                          q=10, 
-                          labels=False, 
-                          duplicates='drop') + 1
+def binning_edges(values, definition):
+    # batas bin dari strategi yang dideklarasikan
+    strategy = definition['strategy']
+    if strategy == 'edges':
+        return np.asarray(definition['edges'], dtype=np.float64)
+    if strategy == 'equal_width':
+        return np.linspace(np.nanmin(values), np.nanmax(values), definition['bins'] + 1)
+    if strategy == 'quantile':
+        return quantile_edges(values, q=definition['q'], backend=definition.get('quantile_backend', 'exact'))
+    raise ValueError(f'strategi binning tidak dikenal: {strategy!r}')
+
+def bin_labels(edges, kind, label_format='{:g}'):
+    # label diturunkan dari batas sehingga selalu sesuai dengan jumlah bin
+    if kind == 'index':
+        return list(range(1, len(edges)))
+    return [f'{label_format.format(lo)} - {label_format.format(hi)}' for lo, hi in zip(edges[:-1], edges[1:])]
+
+def fit_binning(df, definitions=BINNING_DEFINITIONS):
+    # strategi yang bergantung data diubah menjadi batas eksplisit; hasilnya dapat disimpan sebagai JSON dan dipakai ulang
+    fitted = {}
+    for column, definition in definitions.items():
+        edges = binning_edges(df[column], definition)
+        fitted[column] = {'edges': [float(edge) for edge in edges],
+                          'outputs': {name: bin_labels(edges, kind, definition.get('label_format', '{:g}'))
+                                      for name, kind in definition['outputs'].items()}}
+    return fitted
+
+def save_binning(binning, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(binning, f, indent=2)
+
+def load_binning(path):
+    with open(path) as f:
+        return json.load(f)
+
+def bin_codes(values, edges):
+    # kode bin 0..k-1 dengan np.searchsorted; interval tertutup kanan dan batas pertama ikut (seperti pd.cut include_lowest)
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.searchsorted(edges, values, side='left') - 1
+    codes[values == edges[0]] = 0
+
+    # di luar rentang dan nilai kosong diberi kode -1
+    codes[(codes < 0) | (codes >= len(edges) - 1)] = -1
+    return codes.astype(np.min_scalar_type(-len(edges)))
+
+def apply_binning(frame, binning, columns=None):
+    # satu kali searchsorted per fitur; setiap kolom output berupa categorical (kode int8 + label yang disimpan sekali)
+    for column in columns or binning:
+        codes = bin_codes(frame[column].to_numpy(), np.asarray(binning[column]['edges']))
+        for name, labels in binning[column]['outputs'].items():
+            frame[name] = pd.Categorical.from_codes(codes, categories=labels)
+    return frame
+
+# batas binning dihitung sekali dari data bersih (atau dibaca dari cache) lalu dibekukan untuk data baru
+if cache_hit and os.path.exists(binning_path(cache_key)):
+    binning = load_binning(binning_path(cache_key))
+else:
+    binning = traced('fit_binning', fit_binning, df)
+
+# melakukan binning dengan frekuensi yang sama (batas desil eksak seperti qcut() atau dari sketsa kuantil)
+if not cache_hit:
+    traced('apply_binning', apply_binning, df, binning, ['age'])
 
 # tampilkan ouput
 df.head(5)
@@ -202,58 +728,16 @@ histogram_data
 
 
 # %%
-# menentukan batas-batas rentang
-bins = [0, 
-        25089, 
-        50179, 
-        75269, 
-        100359, 
-        125449, 
-        150538, 
-        175628, 
-        200718, 
-        250899]
-
-# memberi label pada rentang
-labels = ['0 - 25089', 
-          '25089 - 50179', 
-          '50179 - 75269', 
-          '75269 - 100359', 
-          '100359 - 125449', 
-          '125449 - 150538', 
-          '150538 - 175628', 
-          '175628 - 200718', 
-          '225808 - 250899']
-
-# membuat kolom baru "balance_range" dengan menggunakan pd.cut() dan tipe data object
-df['balance_range'] = pd.cut(df['balance'], 
-                             bins=bins, 
-                             labels=labels, 
-                             include_lowest=True).astype(object)
+# membuat kolom "balance_range" (label rentang) dan "balance_bins" (nomor bin) dari kode bin yang sama
+if not cache_hit:
+    traced('apply_binning', apply_binning, df, binning, ['balance'])
 
 # menampilkan output
 df
 
 # %%
-# Buat dictionary untuk memetakan balance_range ke balance_bins
-range_to_bins = {
-    '0 - 25089': 1,
-    '25089 - 50179': 2,
-    '50179 - 75269': 3,
-    '75269 - 100359': 4,
-    '100359 - 125449': 5,
-    '125449 - 150538': 6,
-    '150538 - 175628': 7,
-    '175628 - 200718': 8,
-    '200718 - 250899': 9
-}
-
-# Menggunakan map untuk memetakan balance_range ke balance_bins
-df['balance_bins'] = df['balance_range'].map(range_to_bins)
-
-# Tampilkan DataFrame dengan kolom baru yang sudah disesuaikan
-df
-
+# label rentang saldo dan nomor bin diturunkan otomatis dari batas yang sama
+pd.DataFrame(binning['balance']['outputs'])
 
 # %%
 # menghitung frekuensi histogram
@@ -268,24 +752,14 @@ histogram_data = pd.DataFrame({'Rentang credit score': [f'{bins[i]} - {bins[i+1]
 histogram_data
 
 # %%
-# menentukan batas-batas rentang
-bins = [383.0, 429.7, 523.1, 569.8, 616.5, 663.2, 709.9, 756.6, 803.3, 850.0]
+# membuat kolom "credit_score_range" dari batas rentang skor kredit pada registry
+if not cache_hit:
+    traced('apply_binning', apply_binning, df, binning, ['credit_score'])
 
-# memberi label pada rentang
-labels = [
-    '383.0 - 429.7',
-    '429.7 - 523.1',
-    '523.1 - 569.8',
-    '569.8 - 616.5',
-    '616.5 - 663.2',
-    '663.2 - 709.9',
-    '709.9 - 756.6',
-    '756.6 - 803.3',
-    '803.3 - 850.0'
-]
-
-# membuat kolom baru "credit_score_range" dengan menggunakan pd.cut() dan tipe data object
-df['credit_score_range'] = pd.cut(df['credit_score'], bins=bins, labels=labels, include_lowest=True).astype(object)
+    # menyimpan dataset yang telah dibersihkan dan dibinning beserta batas binning ke cache
+    save_cached_frame(df, cache_key)
+    if feather is not None:
+        save_binning(binning, binning_path(cache_key))
 
 # menampilkan output
 df
@@ -295,6 +769,595 @@ df
 churn_data = df[df['churn'] == 1]
 churn_data 
 
+# %% [markdown]
+# `Agregasi churn per segmen`
+# 
+# Jumlah pelanggan, jumlah churn, tingkat churn dan odds ratio untuk seluruh dimensi (dan pasangan dimensi) dihitung sekaligus. Setiap dimensi diubah menjadi kode integer, lalu seluruh kombinasi kode digabung menjadi satu kunci sehingga data cukup dipindai satu kali dengan `np.bincount`. Odds ratio membandingkan odds churn di dalam segmen dengan odds churn di luar segmen.
+
+# %%
+# batas jumlah sel gabungan; di atas batas ini setiap dimensi/pasangan dihitung dengan bincount tersendiri.
+# tabel gabungan juga tidak dipakai jika jumlah selnya melebihi jumlah baris: marginalisasi tabel yang sebagian besar
+# kosong lebih mahal daripada satu bincount per dimensi/pasangan
+MAX_JOINT_CELLS = 50_000_000
+
+def encode_dimension(values):
+    # mengubah kolom menjadi kode integer 0..k-1 beserta labelnya, nilai kosong diberi kode -1
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    array = values.to_numpy()
+
+    # kolom integer berjangkauan kecil (uint8 dsb.): kode diambil dari tabel nilai yang muncul, tanpa hashing
+    if array.dtype.kind in 'iu' and len(array) and int(array.max()) - int(array.min()) < 65536:
+        # selisih dihitung dalam int64 agar tidak overflow pada dtype sempit (misalnya int8 dengan nilai negatif)
+        offset = int(array.min())
+        shifted = array.astype(np.int64) - offset
+        present = np.bincount(shifted) > 0
+        lookup = (np.cumsum(present) - 1).astype(np.min_scalar_type(-len(present)))
+        return lookup[shifted], pd.Index((np.flatnonzero(present) + offset).astype(array.dtype))
+    codes, labels = pd.factorize(values, sort=True)
+    return codes, pd.Index(labels)
+
+def segment_frame(count, churn, index):
+    # menghitung statistik churn dari array jumlah pelanggan dan jumlah churn per segmen
+    total_count, total_churn = count.sum(), churn.sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        churn_rate = churn / count
+        churn_odds = churn / (count - churn)
+        rest_churn = total_churn - churn
+        rest_odds = rest_churn / ((total_count - count) - rest_churn)
+        odds_ratio = churn_odds / rest_odds
+    return pd.DataFrame({'count': count.astype(np.int64),
+                         'churn': churn.astype(np.int64),
+                         'churn_rate': churn_rate,
+                         'churn_odds': churn_odds,
+                         'odds_ratio': odds_ratio}, index=index)
+
+def segment_churn_stats(df, dimensions, pairs=(), target='churn'):
+    # mengembalikan dict {dimensi atau (dimensi_a, dimensi_b): DataFrame statistik churn}
+    pairs = [tuple(pair) for pair in pairs]
+    columns = list(dict.fromkeys(list(dimensions) + [d for pair in pairs for d in pair]))
+    encoded = {col: encode_dimension(df[col]) for col in columns}
+    y = df[target].to_numpy(dtype=np.float64)
+
+    # slot tambahan menampung nilai kosong (hanya jika ada) dan dibuang saat hasil dibentuk
+    n_labels = {col: len(encoded[col][1]) for col in columns}
+    sizes = [n_labels[col] + int((encoded[col][0] < 0).any()) for col in columns]
+    codes = {col: np.where(encoded[col][0] < 0, n_labels[col], encoded[col][0]) for col in columns}
+
+    joint = None
+    if np.prod(sizes, dtype=np.float64) <= min(MAX_JOINT_CELLS, max(len(df), 1)):
+        # satu kali pemindaian: kunci gabungan seluruh dimensi (mixed radix)
+        key = np.zeros(len(df), dtype=np.int64)
+        for col, size in zip(columns, sizes):
+            key = key * size + codes[col]
+        n_cells = int(np.prod(sizes))
+        joint = (np.bincount(key, minlength=n_cells).reshape(sizes),
+                 np.bincount(key, weights=y, minlength=n_cells).reshape(sizes))
+
+    def counts_for(names):
+        if joint is not None:
+            # marginalisasi dimensi lain dari hasil pemindaian tunggal
+            other_axes = tuple(i for i, col in enumerate(columns) if col not in names)
+            order = np.argsort([columns.index(col) for col in names])
+            axes = np.argsort(order)
+            return tuple(np.transpose(arr.sum(axis=other_axes), axes) for arr in joint)
+        key = np.zeros(len(df), dtype=np.int64)
+        for col in names:
+            key = key * sizes[columns.index(col)] + codes[col]
+        shape = [sizes[columns.index(col)] for col in names]
+        n_cells = int(np.prod(shape))
+        return (np.bincount(key, minlength=n_cells).reshape(shape),
+                np.bincount(key, weights=y, minlength=n_cells).reshape(shape))
+
+    stats = {}
+    for col in dimensions:
+        count, churn = counts_for([col])
+        k = n_labels[col]
+        stats[col] = segment_frame(count[:k], churn[:k], encoded[col][1].rename(col))
+    for a, b in pairs:
+        count, churn = counts_for([a, b])
+        index = pd.MultiIndex.from_product([encoded[a][1], encoded[b][1]], names=[a, b])
+        stats[(a, b)] = segment_frame(count[:n_labels[a], :n_labels[b]].ravel(), churn[:n_labels[a], :n_labels[b]].ravel(), index)
+    return stats
+
+# statistik churn untuk seluruh dimensi hasil binning dan kategori
+segment_dimensions = ['age_bins', 'balance_bins', 'credit_score_range', 'tenure', 'products_number',
+                      'country', 'gender', 'credit_card', 'active_member']
+segment_pairs = [('balance_bins', 'age_bins'), ('balance_bins', 'credit_card'),
+                 ('country', 'gender'), ('credit_score_range', 'credit_card')]
+
+def churn_count_table(stats):
+    # jumlah non-churn (0) dan churn (1) per segmen, diambil dari statistik yang sudah diagregasi
+    return pd.DataFrame({0: stats['count'] - stats['churn'], 1: stats['churn']}).astype(np.int64)
+
+def churn_percentage_table(stats):
+    # presentase non-churn (0) dan churn (1) per segmen
+    counts = churn_count_table(stats)
+    return counts.div(counts.sum(axis=1), axis=0) * 100
+
+def churn_count_long(counts, values=(0, 1)):
+    # bentuk panjang (segmen, churn, jumlah) agar sns.barplot dengan hue menggantikan countplot atas baris mentah
+    return counts[list(values)].reset_index().melt(id_vars=counts.index.name, var_name='churn', value_name='jumlah')
+
+# %% [markdown]
+# `Data cube jumlah pelanggan`
+# 
+# Seluruh dimensi berkardinalitas rendah (termasuk churn) dihitung sekali menjadi satu kubus jumlah pelanggan. Setiap tabel silang, irisan 2-D/3-D maupun rollup selanjutnya diambil dari kubus ini tanpa memindai ulang baris data.
+
+# %%
+def build_churn_cube(df, dimensions):
+    # kubus jumlah pelanggan untuk setiap kombinasi nilai dimensi
+    labels, codes, sizes = {}, [], []
+    for col in dimensions:
+        col_codes, col_labels = encode_dimension(df[col])
+        size = len(col_labels)
+
+        # slot tambahan untuk nilai kosong hanya dibuat jika dimensi memiliki nilai kosong
+        if (col_codes < 0).any():
+            col_codes = np.where(col_codes < 0, size, col_codes)
+            size += 1
+        labels[col] = col_labels
+        codes.append(col_codes)
+        sizes.append(size)
+
+    key = np.ravel_multi_index(codes, sizes)
+    counts = np.bincount(key, minlength=int(np.prod(sizes))).reshape(sizes)
+    return {'dimensions': list(dimensions), 'labels': labels, 'counts': counts}
+
+def cube_rollup(cube, dimensions, where=None):
+    # menjumlahkan kubus ke dimensi yang diminta, where = {dimensi: nilai atau list nilai} untuk memfilter
+    counts = cube['counts']
+    cube_dims = cube['dimensions']
+    where = where or {}
+    labels = dict(cube['labels'])
+
+    # memfilter nilai pada dimensi where dan membuang slot nilai kosong pada dimensi hasil
+    for col in cube_dims:
+        axis = cube_dims.index(col)
+        col_labels = cube['labels'][col]
+        if col in where:
+            values = list(where[col]) if isinstance(where[col], (list, tuple, set)) else [where[col]]
+            indexer = col_labels.get_indexer(values)
+            if (indexer < 0).any():
+                raise KeyError(f'nilai {[value for value, i in zip(values, indexer) if i < 0]} tidak ada pada dimensi {col}')
+            counts = np.take(counts, indexer, axis=axis)
+            labels[col] = col_labels[indexer]
+        elif col in dimensions and counts.shape[axis] > len(col_labels):
+            counts = np.take(counts, np.arange(len(col_labels)), axis=axis)
+
+    # rollup dimensi yang tidak diminta lalu mengurutkan sumbu sesuai permintaan
+    other_axes = tuple(i for i, col in enumerate(cube_dims) if col not in dimensions)
+    kept = [col for col in cube_dims if col in dimensions]
+    counts = np.transpose(counts.sum(axis=other_axes), [kept.index(col) for col in dimensions])
+
+    if len(dimensions) == 2:
+        a, b = dimensions
+        return pd.DataFrame(counts,
+                            index=labels[a].rename(a),
+                            columns=labels[b].rename(b))
+    index = pd.MultiIndex.from_product([labels[col] for col in dimensions], names=dimensions)
+    return pd.Series(counts.ravel(), index=index, name='count')
+
+# kubus seluruh dimensi berkardinalitas rendah
+cube_dimensions = ['age_bins', 'balance_bins', 'credit_score_range', 'country', 'gender', 'tenure',
+                   'products_number', 'credit_card', 'active_member', 'churn']
+
+# %% [markdown]
+# `Odd ratio per segmen`
+# 
+# Odd ratio setiap segmen dibandingkan dengan pelanggan di luar segmen, beserta selang kepercayaan dan p-value, untuk seluruh variabel dari satu kali agregasi.
+
+# %%
+# kolom kontinu yang sudah memiliki definisi binning; kolom float lain dibinning dengan kuantil
+CONTINUOUS_BINS = {
+    'age': 'age_bins',
+    'balance': 'balance_bins',
+    'credit_score': 'credit_score_range'
+}
+
+def odds_ratio_table(df, columns, target='churn', q=10, alpha=0.05):
+    # membinning kolom kontinu terlebih dahulu agar jumlah segmen sebanding dengan jumlah bin, bukan jumlah baris
+    binned = {}
+    for col in columns:
+        if col in CONTINUOUS_BINS and CONTINUOUS_BINS[col] in df:
+            binned[col] = df[CONTINUOUS_BINS[col]].array
+        elif pd.api.types.is_float_dtype(df[col]):
+            binned[col] = pd.qcut(df[col], q=q, duplicates='drop').array
+        else:
+            binned[col] = df[col].array
+    binned[target] = df[target].array
+
+    # jumlah pelanggan dan churn untuk seluruh variabel dari satu kali agregasi
+    stats = segment_churn_stats(pd.DataFrame(binned), columns, target=target)
+    table = pd.concat({col: stats[col] for col in columns}, names=['variable', 'level'])
+
+    # tabel 2x2 setiap segmen: churn/non-churn di dalam segmen (a, b) dan di luar segmen (c, d)
+    total_count = table.groupby(level='variable')['count'].transform('sum').to_numpy()
+    total_churn = table.groupby(level='variable')['churn'].transform('sum').to_numpy()
+    a = table['churn'].to_numpy(dtype=np.float64)
+    b = table['count'].to_numpy(dtype=np.float64) - a
+    c = total_churn - a
+    d = (total_count - total_churn) - b
+    cells = np.stack([a, b, c, d])
+
+    # koreksi Haldane (+0.5) untuk segmen yang memiliki sel nol
+    cells = cells + 0.5 * (cells == 0).any(axis=0)
+    a, b, c, d = cells
+
+    # odds ratio, selang kepercayaan dan p-value (uji Wald pada log odds ratio) sekaligus untuk seluruh segmen
+    log_odds_ratio = np.log(a * d / (b * c))
+    se = np.sqrt((1 / cells).sum(axis=0))
+    z = norm.ppf(1 - alpha / 2)
+    return pd.DataFrame({'count': table['count'],
+                         'churn': table['churn'],
+                         'churn_rate': table['churn_rate'],
+                         'odds_ratio': np.exp(log_odds_ratio),
+                         'ci_lower': np.exp(log_odds_ratio - z * se),
+                         'ci_upper': np.exp(log_odds_ratio + z * se),
+                         'p_value': 2 * norm.sf(np.abs(log_odds_ratio / se))}, index=table.index)
+
+# odd ratio (segmen dibandingkan dengan pelanggan di luar segmen) untuk seluruh variabel ini dihitung sekaligus
+odds_ratio_columns = ['age', 'balance', 'credit_score', 'estimated_salary', 'tenure',
+                      'products_number', 'country', 'gender', 'credit_card', 'active_member']
+
+# %% [markdown]
+# `Matriks asosiasi`
+# 
+# Pearson, Spearman, point-biserial terhadap churn dan Cramér's V dihitung dalam satu pemanggilan:
+# - Setiap kolom diubah menjadi nilai terstandarisasi (z-score) per chunk dalam float32. Untuk Spearman yang distandarisasi adalah rank rata-rata. Rank setiap nilai unik dihitung sekali dari `np.unique`, lalu dipetakan ke setiap chunk dengan `searchsorted`.
+# - Matriks korelasi = Z'Z / n, diakumulasi per chunk dengan perkalian matriks BLAS float32, sehingga memori tidak bergantung pada jumlah baris.
+# - Point-biserial adalah korelasi Pearson terhadap churn (biner), dilengkapi p-value uji t.
+# - Cramér's V untuk kolom kategorikal dihitung dari tabel kontingensi hasil `np.bincount`.
+
+# %%
+from scipy.stats import t as t_distribution
+
+def spearman_transform(values, dtype=np.float32, max_rank_table=65536):
+    # rank rata-rata (tie) setiap nilai unik dihitung sekali, hasilnya fungsi (start, stop) -> rank terstandarisasi
+    direct = values.dtype.kind in 'iub' and len(values) > 0 and int(values.max()) - int(values.min()) < max_rank_table
+    if direct:
+        offset = int(values.min())
+        counts = np.bincount(values.astype(np.int64) - offset)
+    else:
+        _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    rank = np.cumsum(counts) - (counts - 1) / 2
+    mean = (len(values) + 1) / 2
+    z_rank = (rank - mean) / np.sqrt((counts * (rank - mean) ** 2).sum() / len(values))
+
+    if direct:
+        # kolom integer berjangkauan kecil: tabel rank diindeks langsung dengan nilai
+        return lambda start, stop: z_rank[values[start:stop].astype(np.int64) - offset]
+    # kolom lain: rank terstandarisasi disimpan sekali dalam float32 lalu dipakai ulang per chunk
+    z_column = z_rank.astype(dtype)[inverse.ravel()]
+    return lambda start, stop: z_column[start:stop]
+
+def column_transforms(df, columns, method='pearson', dtype=np.float32):
+    # fungsi per kolom (start, stop) -> z-score baris tersebut; nilai asli untuk pearson, rank rata-rata untuk spearman
+    transforms = []
+    for col in columns:
+        values = df[col].to_numpy()
+        if method == 'pearson':
+            mean, sd = values.mean(dtype=np.float64), values.std(dtype=np.float64)
+            transforms.append(lambda start, stop, values=values, mean=mean, sd=sd: (values[start:stop] - mean) / sd)
+        elif method == 'spearman':
+            transforms.append(spearman_transform(values, dtype))
+        else:
+            raise ValueError(f"method harus 'pearson' atau 'spearman', bukan {method!r}")
+    return transforms
+
+def correlation_from_chunks(df, columns, method='pearson', chunksize=1_000_000, dtype=np.float32):
+    transforms = column_transforms(df, columns, method, dtype)
+    gram = np.zeros((len(columns), len(columns)))
+    z = np.empty((min(chunksize, len(df)), len(columns)), dtype=dtype)
+    for start in range(0, len(df), chunksize):
+        rows = min(chunksize, len(df) - start)
+        for j, transform in enumerate(transforms):
+            z[:rows, j] = transform(start, start + rows)
+        gram += z[:rows].T @ z[:rows]
+
+    # normalisasi ulang dengan diagonal agar galat pembulatan float32 tidak membuat |r| > 1
+    sd = np.sqrt(np.diag(gram))
+    return pd.DataFrame(gram / np.outer(sd, sd), index=columns, columns=columns)
+
+def cramers_v_matrix(df, columns):
+    encoded = {col: encode_dimension(df[col]) for col in columns}
+    result = pd.DataFrame(np.eye(len(columns)), index=columns, columns=columns)
+    for i, a in enumerate(columns):
+        for b in columns[i + 1:]:
+            (codes_a, labels_a), (codes_b, labels_b) = encoded[a], encoded[b]
+            valid = (codes_a >= 0) & (codes_b >= 0)
+            observed = np.bincount(codes_a[valid] * len(labels_b) + codes_b[valid],
+                                   minlength=len(labels_a) * len(labels_b)).reshape(len(labels_a), len(labels_b))
+            observed = observed[observed.sum(axis=1) > 0][:, observed.sum(axis=0) > 0]
+            n = observed.sum()
+            expected = np.outer(observed.sum(axis=1), observed.sum(axis=0)) / n
+            chi2_stat = ((observed - expected) ** 2 / expected).sum()
+            result.loc[a, b] = result.loc[b, a] = np.sqrt(chi2_stat / (n * (min(observed.shape) - 1)))
+    return result
+
+def association_matrix(df, numeric, categorical=(), target='churn', chunksize=1_000_000, dtype=np.float32):
+    columns = list(numeric) + [target]
+    pearson = correlation_from_chunks(df, columns, 'pearson', chunksize, dtype)
+    spearman = correlation_from_chunks(df, columns, 'spearman', chunksize, dtype)
+
+    # point-biserial = Pearson antara kolom numerik dan target biner
+    r = pearson.loc[list(numeric), target]
+    t_value = r * np.sqrt((len(df) - 2) / (1 - r ** 2))
+    point_biserial = pd.DataFrame({'r': r, 'p_value': 2 * t_distribution.sf(np.abs(t_value), len(df) - 2)})
+    return {'pearson': pearson,
+            'spearman': spearman,
+            'point_biserial': point_biserial,
+            'cramers_v': cramers_v_matrix(df, list(categorical) + [target])}
+
+# Memilih kolom numerik yang relevan
+numeric_columns = ['credit_score', 'age', 'tenure', 'balance', 'products_number', 'credit_card', 'active_member', 'estimated_salary']
+
+# %% [markdown]
+# `Regresi OLS dari statistik cukup`
+# 
+# Model OLS di-fit dari X'X dan X'y yang diakumulasi per chunk, tanpa membentuk matriks desain.
+
+# %%
+import statsmodels.api as sm
+from scipy.stats import t as t_distribution
+from scipy.stats import f as f_distribution
+
+def gram_matrix(df, columns, chunksize=1_000_000):
+    # Z'Z dengan Z = [const, kolom...] diakumulasi per chunk langsung dari array kolom; memori O(chunksize·p + p²)
+    arrays = [df[col].to_numpy() for col in columns]
+    gram = np.zeros((len(columns) + 1, len(columns) + 1))
+    z = np.empty((min(chunksize, len(df)), len(columns) + 1))
+    z[:, 0] = 1
+    for start in range(0, len(df), chunksize):
+        rows = min(chunksize, len(df) - start)
+        for j, values in enumerate(arrays, start=1):
+            z[:rows, j] = values[start:start + rows]
+        gram += z[:rows].T @ z[:rows]
+    return gram
+
+def ols_from_gram(gram, columns, features, target, alpha=0.05):
+    # OLS dari matriks Gram Z'Z (Z = [const, kolom...]) tanpa membentuk matriks desain
+    idx = [columns.index('const')] + [columns.index(col) for col in features]
+    y_idx = columns.index(target)
+    n = gram[0, 0]
+    xtx = gram[np.ix_(idx, idx)]
+    xty = gram[idx, y_idx]
+    yty = gram[y_idx, y_idx]
+
+    beta = np.linalg.solve(xtx, xty)
+    df_resid = n - len(idx)
+    rss = yty - beta @ xty
+    tss = yty - xty[0] ** 2 / n
+    sigma2 = rss / df_resid
+    se = np.sqrt(np.diag(np.linalg.inv(xtx)) * sigma2)
+    t_value = beta / se
+    t_crit = t_distribution.ppf(1 - alpha / 2, df_resid)
+
+    coefficients = pd.DataFrame({'coef': beta,
+                                 'std_err': se,
+                                 't': t_value,
+                                 'p_value': 2 * t_distribution.sf(np.abs(t_value), df_resid),
+                                 'ci_lower': beta - t_crit * se,
+                                 'ci_upper': beta + t_crit * se}, index=['const'] + list(features))
+    r_squared = 1 - rss / tss
+    df_model = len(features)
+    f_statistic = (tss - rss) / df_model / sigma2
+    summary = {'n': int(n),
+               'df_model': df_model,
+               'df_resid': int(df_resid),
+               'r_squared': r_squared,
+               'adj_r_squared': 1 - (1 - r_squared) * (n - 1) / df_resid,
+               'f_statistic': f_statistic,
+               'f_p_value': f_distribution.sf(f_statistic, df_model, df_resid)}
+    return coefficients, summary
+
+def ols_sufficient(df, features, target='churn', chunksize=1_000_000, alpha=0.05):
+    # OLS dari statistik cukup; Gram dari beberapa partisi cukup dijumlahkan sebelum diselesaikan
+    columns = ['const'] + list(features) + [target]
+    return ols_from_gram(gram_matrix(df, columns[1:], chunksize), columns, features, target, alpha)
+
+# Menentukan variabel dependen (tingkat churn) dan variabel independen (age, balance dan active_member)
+ols_features = ['age', 'balance', 'active_member']
+
+# %% [markdown]
+# `Uji chi-square seluruh variabel kategorikal sekaligus`
+# 
+# Tabel kontingensi setiap variabel terhadap churn dibangun dari satu kali agregasi (`segment_churn_stats`). Nilai chi-square, p-value dan Cramér's V kemudian dihitung secara vektor untuk semua variabel, dan p-value dikoreksi untuk pengujian berganda (default Benjamini-Hochberg).
+
+# %%
+from statsmodels.stats.multitest import multipletests
+
+def chi_square_from_stats(stats, columns, target='churn', correction=True, method='fdr_bh', alpha=0.05):
+    # stats = {variabel: DataFrame dengan kolom count dan churn per segmen}, misalnya hasil segment_churn_stats
+    # menggabungkan tabel kontingensi seluruh variabel menjadi satu matriks (segmen x [non-churn, churn])
+    tables = [stats[col][stats[col]['count'] > 0] for col in columns]
+    variable = np.repeat(np.arange(len(columns)), [len(table) for table in tables])
+    churned = np.concatenate([table['churn'].to_numpy() for table in tables]).astype(np.float64)
+    observed = np.column_stack([np.concatenate([table['count'].to_numpy() for table in tables]) - churned, churned])
+
+    # frekuensi harapan = total baris x total kolom / total per variabel
+    col_totals = np.column_stack([np.bincount(variable, weights=observed[:, j]) for j in range(2)])
+    n = col_totals.sum(axis=1)
+    row_totals = observed.sum(axis=1, keepdims=True)
+    expected = row_totals * col_totals[variable] / n[variable, None]
+
+    levels = np.bincount(variable)
+    dof = (levels - 1) * (2 - 1)
+
+    # koreksi Yates untuk tabel 2x2 (sama seperti chi2_contingency)
+    if correction:
+        yates = (dof == 1)[variable, None]
+        diff = expected - observed
+        observed_adj = np.where(yates, observed + np.sign(diff) * np.minimum(0.5, np.abs(diff)), observed)
+    else:
+        observed_adj = observed
+    chi2_stat = np.bincount(variable, weights=((observed_adj - expected) ** 2 / expected).sum(axis=1))
+    p_value = chi2_distribution.sf(chi2_stat, dof)
+
+    # Cramér's V dengan min(baris, kolom) - 1 = 1 karena target biner; chi-square tanpa koreksi
+    chi2_raw = np.bincount(variable, weights=((observed - expected) ** 2 / expected).sum(axis=1))
+    cramers_v = np.sqrt(chi2_raw / n)
+
+    reject, p_adjusted, _, _ = multipletests(p_value, alpha=alpha, method=method)
+    results = pd.DataFrame({'chi2': chi2_stat,
+                            'p_value': p_value,
+                            'dof': dof,
+                            'cramers_v': cramers_v,
+                            'p_adjusted': p_adjusted,
+                            'significant': reject}, index=pd.Index(columns, name='variable'))
+
+    # tabel kontingensi dan frekuensi harapan per variabel untuk ditampilkan
+    contingency_tables, expected_tables = {}, {}
+    for i, (col, table) in enumerate(zip(columns, tables)):
+        rows = variable == i
+        contingency_tables[col] = pd.DataFrame(observed[rows].astype(np.int64), index=table.index,
+                                               columns=pd.Index([0, 1], name=target))
+        expected_tables[col] = pd.DataFrame(expected[rows], index=table.index,
+                                            columns=pd.Index([0, 1], name=target))
+    return results, contingency_tables, expected_tables
+
+def chi_square_batch(df, columns, target='churn', **kwargs):
+    return chi_square_from_stats(segment_churn_stats(df, columns, target=target), columns, target=target, **kwargs)
+
+# uji chi-square seluruh variabel kategorikal dan hasil binning terhadap churn
+chi_square_columns = ['products_number', 'active_member', 'credit_card', 'country', 'gender', 'tenure',
+                      'age_bins', 'balance_bins', 'credit_score_range']
+
+# %% [markdown]
+# ## ```EKSEKUSI PARALEL```
+# 
+# Setelah `df` bersih tersedia, bagian analisis (agregasi segmen, kubus, odd ratio, korelasi, OLS, chi-square) didefinisikan di atas sebagai task bernama dengan input yang dideklarasikan. Chi-square memakai hasil agregasi segmen, task lain hanya membutuhkan `df`. Task yang sudah siap dijalankan bersamaan pada process pool. Worker membaca `df` dengan memory map dari cache Arrow (tanpa salinan per task); jika cache tidak tersedia worker memakai `df` warisan proses induk (fork). Waktu setiap task dan jalur kritis (critical path) ditampilkan. Setiap analisis hanya dihitung sekali: hasil task diikat ke `segment_stats`, `churn_cube`, `odds_ratios`, `associations`, `ols_coefficients` dan `chi_square_results` yang dipakai oleh bagian-bagian selanjutnya.
+
+# %%
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# task: nama -> (fungsi, daftar input); input 'df' adalah dataset bersih, input lain adalah hasil task lain
+ANALYSIS_TASKS = {
+    'segment_stats': (lambda df: segment_churn_stats(df, segment_dimensions, segment_pairs), ['df']),
+    'churn_cube': (lambda df: build_churn_cube(df, cube_dimensions), ['df']),
+    'odds_ratios': (lambda df: odds_ratio_table(df, odds_ratio_columns), ['df']),
+    'correlation': (lambda df: association_matrix(df, numeric_columns, ['country', 'gender']), ['df']),
+    'ols': (lambda df: ols_sufficient(df, ols_features, 'churn'), ['df']),
+    'chi_square': (lambda segment_stats: chi_square_from_stats(segment_stats, chi_square_columns), ['segment_stats'])
+}
+
+_worker_state = {}
+
+def _init_worker(tasks, frame_path):
+    _worker_state['tasks'] = tasks
+    _worker_state['frame_path'] = frame_path
+
+def _worker_frame():
+    # df dibaca sekali per worker: memory map dari file Arrow, atau df warisan proses induk
+    if 'df' not in _worker_state:
+        path = _worker_state['frame_path']
+        if path is not None:
+            _worker_state['df'] = feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+        else:
+            _worker_state['df'] = df
+    return _worker_state['df']
+
+def _run_task(name, inputs):
+    fn, input_names = _worker_state['tasks'][name]
+    args = [_worker_frame() if input_name == 'df' else inputs[input_name] for input_name in input_names]
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, start, time.perf_counter(), os.getpid()
+
+def run_task_graph(tasks, frame_path=None, max_workers=None):
+    # menjalankan task yang inputnya sudah tersedia secara paralel; tanpa start method fork task dijalankan berurutan
+    results, timings = {}, {}
+    pending = dict(tasks)
+    run_start = time.perf_counter()
+
+    def ready():
+        return [name for name, (_, inputs) in pending.items()
+                if all(input_name == 'df' or input_name in results for input_name in inputs)]
+
+    def record(name, output):
+        results[name], start, end, pid = output
+        timings[name] = {'start': start - run_start, 'end': end - run_start, 'wall_time': end - start, 'pid': pid}
+
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        _init_worker(tasks, frame_path)
+        while pending:
+            for name in ready():
+                record(name, _run_task(name, results))
+                del pending[name]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context('fork'),
+                                 initializer=_init_worker,
+                                 initargs=(tasks, frame_path)) as pool:
+            running = {}
+            while pending or running:
+                for name in ready():
+                    inputs = {input_name: results[input_name] for input_name in pending[name][1] if input_name != 'df'}
+                    running[pool.submit(_run_task, name, inputs)] = name
+                    del pending[name]
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(running.pop(future), future.result())
+
+    # jalur kritis: rantai task dengan waktu selesai (berdasarkan durasi) paling lama
+    finish, previous = {}, {}
+    for name in sorted(timings, key=lambda task: timings[task]['end']):
+        deps = [dep for dep in tasks[name][1] if dep != 'df']
+        previous[name] = max(deps, key=lambda dep: finish[dep]) if deps else None
+        finish[name] = timings[name]['wall_time'] + (finish[previous[name]] if deps else 0.0)
+    critical = [max(finish, key=finish.get)]
+    while previous[critical[-1]] is not None:
+        critical.append(previous[critical[-1]])
+
+    report = pd.DataFrame(timings).T.sort_values('start').astype({'pid': int})
+    report['critical_path'] = report.index.isin(critical)
+    return results, report
+
+# worker memakai file cache Arrow yang sama (memory map) jika tersedia
+shared_frame_path = cache_path(cache_key) if feather is not None and os.path.exists(cache_path(cache_key)) else None
+with trace_stage('task_graph', rows_in=len(df)) as task_graph_event:
+    task_results, task_report = run_task_graph(ANALYSIS_TASKS, frame_path=shared_frame_path)
+if TRACE_ENABLED:
+    trace_task_report(task_report, task_graph_event)
+
+print(task_report)
+print('Total waktu:', round(task_report['end'].max(), 3), 'detik')
+
+# hasil task dipakai langsung oleh bagian-bagian berikutnya
+segment_stats = task_results['segment_stats']
+churn_cube = task_results['churn_cube']
+odds_ratios = task_results['odds_ratios']
+associations = task_results['correlation']
+ols_coefficients, ols_summary = task_results['ols']
+chi_square_results, contingency_tables, expected_tables = task_results['chi_square']
+
+# %% [markdown]
+# `Representasi kerja terkode`
+# 
+# Kolom hasil binning disimpan sebagai categorical: satu array kode int8 yang contiguous per dimensi, sedangkan label (misalnya `'0 - 25090'`) disimpan sekali pada kamus kategori. Kolom dimensi lain (tenure, products_number, credit_card, active_member) sudah berupa uint8 dan country/gender berupa categorical. `encode_dimension` langsung memakai kode-kode ini, sehingga agregasi segmen, kubus, chi-square, odd ratio dan plot tidak perlu melakukan hashing atau membandingkan string per baris.
+# 
+# Perbandingan dengan representasi lama (label string object) hanya dijalankan bersama benchmark (`CHURN_BENCH=1`).
+
+# %%
+def frame_memory_mb(frame):
+    return frame.memory_usage(deep=True).sum() / 1024 ** 2
+
+if BENCHMARK_ENABLED:
+    # pembanding: representasi lama (label rentang sebagai string object, nomor bin int64/float64)
+    legacy_frame = df.astype({'age_bins': np.int64, 'balance_bins': np.float64,
+                              'balance_range': object, 'credit_score_range': object})
+    binned_columns = [name for fit in binning.values() for name in fit['outputs']]
+
+    for label, frame in [('lama', legacy_frame), ('terkode', df)]:
+        start = time.perf_counter()
+        segment_churn_stats(frame, binned_columns)
+        print(f'representasi {label}: kolom binning {frame_memory_mb(frame[binned_columns]):.3f} MB, '
+              f'seluruh frame {frame_memory_mb(frame):.3f} MB, agregasi {time.perf_counter() - start:.4f} detik')
+    del legacy_frame
+else:
+    print('Perbandingan representasi dilewati (jalankan dengan CHURN_BENCH=1)')
+
 # %% [markdown]
 # ## ``UNVARITE ANALISYST``
 
@@ -381,21 +1444,27 @@ churn_data.info()
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+# Mengambil jumlah churn dan non-churn untuk setiap tenure dari hasil agregasi segmen
+churn_count_by_tenure = churn_count_table(segment_stats['tenure'])
+
+# Menghitung presentase churn untuk setiap tenure
+churn_percentage_by_tenure = churn_percentage_table(segment_stats['tenure'])
+
 # Mengatur ukuran dan layout subplot
 fig, (ax1, ax2) = plt.subplots(nrows=1, ncols=2, figsize=(18, 6))
 
 # Visualisasi pertama: Countplot untuk jumlah churn berdasarkan tenure
-sns.countplot(data=churn_data, x='tenure', hue='churn', palette='deep', ax=ax1)
+sns.barplot(data=churn_count_long(churn_count_by_tenure, values=(1,)), x='tenure', y='jumlah', hue='churn', palette='deep', ax=ax1)
 ax1.set_title('Perbandingan Tenure Berdasarkan Churn')
 ax1.set_xlabel('Tenure')
 ax1.set_ylabel('Jumlah')
 for p in ax1.patches:
-    ax1.annotate(f'{p.get_height()}', 
+    ax1.annotate(f'{p.get_height():.0f}', 
                  (p.get_x() + p.get_width() / 2., p.get_height()), 
                  ha='center', va='center', xytext=(0, 10), textcoords='offset points')
 
 # Visualisasi kedua: Barplot untuk presentase churn berdasarkan tenure
-sns.barplot(data=df, x='tenure', y='churn', ci=None, estimator=lambda x: sum(x == 1) / len(x) * 100, color='skyblue', ax=ax2)
+sns.barplot(data=churn_percentage_by_tenure.reset_index(), x='tenure', y=1, color='skyblue', ax=ax2)
 ax2.set_title('Presentase Churn Berdasarkan Tenure')
 ax2.set_xlabel('Tenure')
 ax2.set_ylabel('Presentase Churn (%)')
@@ -424,21 +1493,27 @@ plt.show()
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+# Mengambil jumlah churn dan non-churn untuk setiap jumlah produk dari hasil agregasi segmen
+churn_count_by_products_number = churn_count_table(segment_stats['products_number'])
+
+# Menghitung presentase churn untuk setiap jumlah produk
+churn_percentage_by_products_number = churn_percentage_table(segment_stats['products_number'])
+
 # Mengatur ukuran dan layout subplot
 fig, (ax1, ax2) = plt.subplots(nrows=1, ncols=2, figsize=(18, 6))
 
 # Visualisasi pertama: Countplot untuk jumlah churn berdasarkan jumlah produk
-sns.countplot(data=df, x='products_number', hue='churn', palette='deep', ax=ax1)
+sns.barplot(data=churn_count_long(churn_count_by_products_number), x='products_number', y='jumlah', hue='churn', palette='deep', ax=ax1)
 ax1.set_title('Perbandingan Produk Nomor Berdasarkan Churn')
 ax1.set_xlabel('Produk Nomor')
 ax1.set_ylabel('Jumlah')
 for p in ax1.patches:
-    ax1.annotate(f'{p.get_height()}', 
+    ax1.annotate(f'{p.get_height():.0f}', 
                  (p.get_x() + p.get_width() / 2., p.get_height()), 
                  ha='center', va='center', xytext=(0, 10), textcoords='offset points')
 
 # Visualisasi kedua: Barplot untuk presentase churn berdasarkan jumlah produk
-sns.barplot(data=df, x='products_number', y='churn', ci=None, estimator=lambda x: sum(x == 1) / len(x) * 100, color='skyblue', ax=ax2)
+sns.barplot(data=churn_percentage_by_products_number.reset_index(), x='products_number', y=1, color='skyblue', ax=ax2)
 ax2.set_title('Presentase Churn Berdasarkan Produk Nomor')
 ax2.set_xlabel('Produk Nomor')
 ax2.set_ylabel('Presentase Churn (%)')
@@ -464,21 +1539,27 @@ plt.show()
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+# Mengambil jumlah churn dan non-churn untuk setiap kartu kredit dari hasil agregasi segmen
+churn_count_by_credit_card = churn_count_table(segment_stats['credit_card'])
+
+# Menghitung presentase churn untuk setiap kartu kredit
+churn_percentage_by_credit_card = churn_percentage_table(segment_stats['credit_card'])
+
 # Mengatur ukuran dan layout subplot
 fig, (ax1, ax2) = plt.subplots(nrows=1, ncols=2, figsize=(18, 6))
 
 # Visualisasi pertama: Countplot untuk jumlah churn berdasarkan kartu kredit
-sns.countplot(data=df, x='credit_card', hue='churn', palette='deep', ax=ax1)
+sns.barplot(data=churn_count_long(churn_count_by_credit_card), x='credit_card', y='jumlah', hue='churn', palette='deep', ax=ax1)
 ax1.set_title('Perbandingan Kartu Kredit Berdasarkan Churn')
 ax1.set_xlabel('Kartu Kredit')
 ax1.set_ylabel('Jumlah')
 for p in ax1.patches:
-    ax1.annotate(f'{p.get_height()}', 
+    ax1.annotate(f'{p.get_height():.0f}', 
                  (p.get_x() + p.get_width() / 2., p.get_height()), 
                  ha='center', va='center', xytext=(0, 10), textcoords='offset points')
 
 # Visualisasi kedua: Barplot untuk presentase churn berdasarkan kartu kredit
-sns.barplot(data=df, x='credit_card', y='churn', ci=None, estimator=lambda x: sum(x == 1) / len(x) * 100, color='skyblue', ax=ax2)
+sns.barplot(data=churn_percentage_by_credit_card.reset_index(), x='credit_card', y=1, color='skyblue', ax=ax2)
 ax2.set_title('Presentase Churn Berdasarkan Kartu Kredit')
 ax2.set_xlabel('Kartu Kredit')
 ax2.set_ylabel('Presentase Churn (%)')
@@ -503,21 +1584,27 @@ plt.show()
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+# Mengambil jumlah churn dan non-churn untuk setiap member aktif dari hasil agregasi segmen
+churn_count_by_active_member = churn_count_table(segment_stats['active_member'])
+
+# Menghitung presentase churn untuk setiap member aktif
+churn_percentage_by_active_member = churn_percentage_table(segment_stats['active_member'])
+
 # Mengatur ukuran dan layout subplot
 fig, (ax1, ax2) = plt.subplots(nrows=1, ncols=2, figsize=(18, 6))
 
 # Visualisasi pertama: Countplot untuk jumlah churn berdasarkan kartu kredit
-sns.countplot(data=df, x='active_member', hue='churn', palette='deep', ax=ax1)
+sns.barplot(data=churn_count_long(churn_count_by_active_member), x='active_member', y='jumlah', hue='churn', palette='deep', ax=ax1)
 ax1.set_title('Perbandingan Member Aktif Berdasarkan Churn')
 ax1.set_xlabel('Member Aktif')
 ax1.set_ylabel('Jumlah')
 for p in ax1.patches:
-    ax1.annotate(f'{p.get_height()}', 
+    ax1.annotate(f'{p.get_height():.0f}', 
                  (p.get_x() + p.get_width() / 2., p.get_height()), 
                  ha='center', va='center', xytext=(0, 10), textcoords='offset points')
 
 # Visualisasi kedua: Barplot untuk presentase churn berdasarkan kartu kredit
-sns.barplot(data=df, x='active_member', y='churn', ci=None, estimator=lambda x: sum(x == 1) / len(x) * 100, color='skyblue', ax=ax2)
+sns.barplot(data=churn_percentage_by_active_member.reset_index(), x='active_member', y=1, color='skyblue', ax=ax2)
 ax2.set_title('Perbandingan Member Aktif Berdasarkan Churn')
 ax2.set_xlabel('Member Aktif')
 ax2.set_ylabel('Presentase Churn (%)')
@@ -541,22 +1628,22 @@ plt.show()
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-# Menghitung jumlah churn dan non-churn untuk setiap rentang umur
-churn_count_by_age_bins = df.groupby('age_bins')['churn'].value_counts().unstack().fillna(0)
+# Mengambil jumlah churn dan non-churn untuk setiap rentang umur dari hasil agregasi segmen
+churn_count_by_age_bins = churn_count_table(segment_stats['age_bins'])
 
 # Menghitung presentase churn untuk setiap rentang umur
-churn_percentage_by_age_bins = churn_count_by_age_bins.div(churn_count_by_age_bins.sum(axis=1), axis=0) * 100
+churn_percentage_by_age_bins = churn_percentage_table(segment_stats['age_bins'])
 
 # Mengatur ukuran dan layout subplot
 fig, (ax1, ax2) = plt.subplots(nrows=1, ncols=2, figsize=(18, 6))
 
 # Visualisasi pertama: Countplot untuk jumlah churn berdasarkan rentang umur
-sns.countplot(data=churn_data, x='age_bins', hue='churn', palette='deep', ax=ax1)
+sns.barplot(data=churn_count_long(churn_count_by_age_bins, values=(1,)), x='age_bins', y='jumlah', hue='churn', palette='deep', ax=ax1)
 ax1.set_title('Perbandingan Rentang Umur Berdasarkan Churn')
 ax1.set_xlabel('Rentang Umur')
 ax1.set_ylabel('Jumlah')
 for p in ax1.patches:
-    ax1.annotate(f'{p.get_height()}', 
+    ax1.annotate(f'{p.get_height():.0f}', 
                  (p.get_x() + p.get_width() / 2., p.get_height()), 
                  ha='center', va='center', xytext=(0, 10), textcoords='offset points')
 
@@ -592,22 +1679,22 @@ plt.show()
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-# Menghitung jumlah churn dan non-churn untuk setiap rentang pendapatan
-churn_count_by_balance_bins = df.groupby('balance_bins')['churn'].value_counts().unstack().fillna(0)
+# Mengambil jumlah churn dan non-churn untuk setiap rentang pendapatan dari hasil agregasi segmen
+churn_count_by_balance_bins = churn_count_table(segment_stats['balance_bins'])
 
 # Menghitung presentase churn untuk setiap rentang pendapatan
-churn_percentage_by_balance_bins = churn_count_by_balance_bins.div(churn_count_by_balance_bins.sum(axis=1), axis=0) * 100
+churn_percentage_by_balance_bins = churn_percentage_table(segment_stats['balance_bins'])
 
 # Mengatur ukuran dan layout subplot
 fig, (ax1, ax2) = plt.subplots(nrows=1, ncols=2, figsize=(18, 6))
 
 # Visualisasi pertama: Countplot untuk jumlah churn berdasarkan rentang pendapatan
-sns.countplot(data=df, x='balance_bins', hue='churn', palette='deep', ax=ax1)
+sns.barplot(data=churn_count_long(churn_count_by_balance_bins), x='balance_bins', y='jumlah', hue='churn', palette='deep', ax=ax1)
 ax1.set_title('Perbandingan Rentang Pendapatan Berdasarkan Churn')
 ax1.set_xlabel('Rentang Pendapatan')
 ax1.set_ylabel('Jumlah')
 for p in ax1.patches:
-    ax1.annotate(f'{p.get_height()}', 
+    ax1.annotate(f'{p.get_height():.0f}', 
                  (p.get_x() + p.get_width() / 2., p.get_height()), 
                  ha='center', va='center', xytext=(0, 10), textcoords='offset points')
 
@@ -637,21 +1724,27 @@ plt.show()
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+# Mengambil jumlah churn dan non-churn untuk setiap gender dari hasil agregasi segmen
+churn_count_by_gender = churn_count_table(segment_stats['gender'])
+
+# Menghitung presentase churn untuk setiap gender
+churn_percentage_by_gender = churn_percentage_table(segment_stats['gender'])
+
 # Mengatur ukuran dan layout subplot
 fig, (ax1, ax2) = plt.subplots(nrows=1, ncols=2, figsize=(18, 6))
 
 # Visualisasi pertama: Countplot untuk jumlah churn berdasarkan kartu kredit
-sns.countplot(data=churn_data, x='gender', hue='churn', palette='deep', ax=ax1)
+sns.barplot(data=churn_count_long(churn_count_by_gender, values=(1,)), x='gender', y='jumlah', hue='churn', palette='deep', ax=ax1)
 ax1.set_title('Perbandingan Gender Berdasarkan Churn')
 ax1.set_xlabel('Gender')
 ax1.set_ylabel('Jumlah')
 for p in ax1.patches:
-    ax1.annotate(f'{p.get_height()}', 
+    ax1.annotate(f'{p.get_height():.0f}', 
                  (p.get_x() + p.get_width() / 2., p.get_height()), 
                  ha='center', va='center', xytext=(0, 10), textcoords='offset points')
 
 # Visualisasi kedua: Barplot untuk presentase churn berdasarkan kartu kredit
-sns.barplot(data=df, x='gender', y='churn', ci=None, estimator=lambda x: sum(x == 1) / len(x) * 100, color='skyblue', ax=ax2)
+sns.barplot(data=churn_percentage_by_gender.reset_index(), x='gender', y=1, color='skyblue', ax=ax2)
 ax2.set_title('Presentase Churn Berdasarkan Kartu Kredit')
 ax2.set_xlabel('Kartu Kredit')
 ax2.set_ylabel('Presentase Churn (%)')
@@ -667,12 +1760,16 @@ plt.show()
 # %% [markdown]
 # ## **2. Melihat tingkat hubungan faktor lain terhadap tingkat churn**
 
+# %%
+# kubus dihitung sekali pada task graph (bagian eksekusi paralel)
+print('Ukuran kubus:', churn_cube['counts'].shape, f"({churn_cube['counts'].nbytes / 1024 ** 2:.1f} MB)")
+
 # %%
 import seaborn as sns
 import matplotlib.pyplot as plt
 
 # Menghitung jumlah churn dan non-churn untuk setiap rentang pendapatan dan rentang usia
-age_bins_count_by_balance_bins = churn_data.groupby('balance_bins')['age_bins'].value_counts().unstack().fillna(0).astype(int)
+age_bins_count_by_balance_bins = cube_rollup(churn_cube, ['balance_bins', 'age_bins'], where={'churn': 1}).astype(int)
 
 # Menampilkan heatmap
 plt.figure(figsize=(12, 8))
@@ -696,7 +1793,7 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 
 # Menghitung jumlah churn dan non-churn untuk setiap rentang pendapatan dan rentang usia
-age_bins_count_by_credit_card = churn_data.groupby('balance_bins')['credit_card'].value_counts().unstack().fillna(0).astype(int)
+age_bins_count_by_credit_card = cube_rollup(churn_cube, ['balance_bins', 'credit_card'], where={'churn': 1}).astype(int)
 
 # Menampilkan heatmap
 plt.figure(figsize=(12, 8))
@@ -715,7 +1812,7 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 
 # Menghitung jumlah churn dan non-churn untuk setiap rentang pendapatan dan kartu kredit
-credit_card_count_by_balance_bins = churn_data.groupby('balance_bins')['credit_card'].value_counts().unstack().fillna(0).astype(int)
+credit_card_count_by_balance_bins = cube_rollup(churn_cube, ['balance_bins', 'credit_card'], where={'churn': 1}).astype(int)
 
 # Menampilkan heatmap
 plt.figure(figsize=(12, 8))
@@ -735,7 +1832,7 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 
 # Menghitung jumlah churn dan non-churn untuk setiap rentang pendapatan dan rentang usia
-country_by_gender = churn_data.groupby('country')['gender'].value_counts().unstack().fillna(0).astype(int)
+country_by_gender = cube_rollup(churn_cube, ['country', 'gender'], where={'churn': 1}).astype(int)
 
 # Menampilkan heatmap
 plt.figure(figsize=(12, 8))
@@ -749,7 +1846,7 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 
 # Menghitung jumlah churn dan non-churn untuk setiap rentang pendapatan dan rentang usia
-credit_card_by_credit_score = churn_data.groupby('credit_score_range')['credit_card'].value_counts().unstack().fillna(0).astype(int)
+credit_card_by_credit_score = cube_rollup(churn_cube, ['credit_score_range', 'credit_card'], where={'churn': 1}).astype(int)
 
 # Menampilkan heatmap
 plt.figure(figsize=(12, 8))
@@ -792,32 +1889,18 @@ plt.show()
 # ## Odd, Hipotesis, Ordinary Least Squares (OLS), Signifikansi: R-Square
 
 # %%
-# Menghitung jumlah churn dan non-churn untuk setiap nilai 'age'
-churn_count_by_age = df.groupby('age')['churn'].value_counts().unstack().fillna(0)
+# Menghitung odd ratio untuk 'age' per rentang umur dan urutkan secara descending
+odd_ratio_age = odds_ratios.loc['age']
+odd_ratio_age_sorted = odd_ratio_age.sort_values('odds_ratio', ascending=False)
 
-# Menghitung proporsi churn untuk setiap nilai 'age'
-churn_percentage_by_age = churn_count_by_age.div(churn_count_by_age.sum(axis=1), axis=0)
-
-# Menghitung odd ratio untuk 'age'
-odd_ratio_age = churn_percentage_by_age[1] / churn_percentage_by_age[0]
-
-# Urutkan secara descending
-odd_ratio_age_sorted = odd_ratio_age.sort_values(ascending=False)
-
-# Menghitung jumlah churn dan non-churn untuk setiap nilai 'balance'
-churn_count_by_balance = df.groupby('balance')['churn'].value_counts().unstack().fillna(0)
-
-# Menghitung proporsi churn untuk setiap nilai 'balance'
-churn_percentage_by_balance = churn_count_by_balance.div(churn_count_by_balance.sum(axis=1), axis=0)
-
-# Menghitung odd ratio untuk 'balance'
-odd_ratio_balance = churn_percentage_by_balance[1] / churn_percentage_by_balance[0]
+# Menghitung odd ratio untuk 'balance' per rentang saldo
+odd_ratio_balance = odds_ratios.loc['balance']
 
 # Menghitung odd ratio untuk 'active_member'
-odd_ratio_active_member = df.groupby('active_member')['churn'].value_counts().unstack().fillna(0).iloc[1] / df.groupby('active_member')['churn'].value_counts().unstack().fillna(0).iloc[0]
+odd_ratio_active_member = odds_ratios.loc['active_member']
 
 # Menghitung odd ratio untuk 'credit_card'
-odd_ratio_credit_card = df.groupby('credit_card')['churn'].value_counts().unstack().fillna(0).iloc[1] / df.groupby('credit_card')['churn'].value_counts().unstack().fillna(0).iloc[0]
+odd_ratio_credit_card = odds_ratios.loc['credit_card']
 
 # Menampilkan odd ratio untuk semua variabel
 print("Odd Ratio for Age:")
@@ -835,6 +1918,8 @@ print(odd_ratio_balance)
 print()
 
 # %% [markdown]
+# Catatan: odd ratio saldo dihitung per rentang saldo (`balance_bins`), bukan per nilai saldo mentah, sehingga setiap segmen memiliki cukup pelanggan dan tidak ada pembagian dengan nol.
+# 
 # odd rasio sebesar 0,15 atau 15%. Terdapat nilai odd ratio yang sangat tinggi (infiniti) untuk beberapa rentang balance yang berarti rentang balance sangat tinggi cenderung tidak churn. Sebaliknya, terdapat juga nilai odd ratio yang sangat rendah memiliki kecenderungan tinggi untuk churn. Analisis ini menunjukkan bahwa saldo akun konsumen adalah faktor penting yang memengaruhi tingkat churn, dengan kecenderungan untuk churn cenderung lebih rendah pada konsumen dengan saldo yang lebih tinggi, dan sebaliknya. 
 
 # %%
@@ -894,11 +1979,8 @@ print()
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-# Memilih kolom numerik yang relevan
-numeric_columns = ['credit_score', 'age', 'tenure', 'balance', 'products_number', 'credit_card', 'active_member', 'estimated_salary']
-
-# Menghitung korelasi antar kolom numerik
-correlation_matrix = df[numeric_columns + ['churn']].corr()
+# Korelasi antar kolom numerik beserta Spearman, point-biserial dan Cramér's V (dihitung pada task graph)
+correlation_matrix = associations['pearson']
 
 # Membuat gambar (figure) baru dengan ukuran 12x8 inch
 plt.figure(figsize=(12, 8))
@@ -912,6 +1994,12 @@ plt.title('Korelasi antara Variabel Numerik dan Churn')
 # Menampilkan plot
 plt.show()
 
+# %%
+# korelasi rank (Spearman), point-biserial terhadap churn dan Cramér's V untuk kolom kategorikal
+print(associations['spearman'].round(2))
+print(associations['point_biserial'])
+print(associations['cramers_v'].round(3))
+
 
 # %% [markdown]
 # Melihat korelasi positif antara variabe churn dengan age dan balance yakni sebesar 0,35 dan 0,12 yang artinya masuk dalam kategori korelasi lemah. Meskipun begitu dapat ditetapkan bahwa terdapat antara churn dengan age dan balance. sehingga dapat diartikan bahwa semakin tua usia pelanggan maka semakin tinggi peluang untuk mereka churn. Sedangkan aktif member memiliki korelasi negatif terhadap churn sebesar 0,15 sehingga dapat diartikan bahwa member tidak aktif cenderung memiliki churn tinggi dibandingkan member aktif.
@@ -945,25 +2033,26 @@ plt.show()
 # # ```OLS```
 
 # %%
-import statsmodels.api as sm
-
-# Menentukan variabel dependen (tingkat churn)
-y = df['churn']
-
-# Menentukan variabel independen (age dan balance)
-X = df[['age', 'balance', 'active_member']]
-
-# Menambahkan kolom konstan untuk model regresi
-X = sm.add_constant(X)
-
-# Membuat model regresi linier menggunakan OLS
-ols_model = sm.OLS(y, X)
-
-# Melakukan fitting model ke data
-result = ols_model.fit()
-
-# Menampilkan hasil summary
-print(result.summary())
+def format_ols_summary(coefficients, summary):
+    # ringkasan teks setara bagian utama result.summary() milik statsmodels
+    header = pd.Series({'No. Observations': summary['n'],
+                        'Df Model': summary['df_model'],
+                        'Df Residuals': summary['df_resid'],
+                        'R-squared': round(summary['r_squared'], 3),
+                        'Adj. R-squared': round(summary['adj_r_squared'], 3),
+                        'F-statistic': round(summary['f_statistic'], 1),
+                        'Prob (F-statistic)': summary['f_p_value']}, dtype=object)
+    return header.to_string() + '\n\n' + coefficients.to_string(float_format=lambda value: f'{value:.4g}')
+
+# Menampilkan hasil summary (model di-fit dari X'X dan X'y tanpa membentuk matriks desain pada task graph)
+print(format_ols_summary(ols_coefficients, ols_summary))
+
+# pengecekan (CHURN_CHECKS=1): Gram dari beberapa partisi yang dijumlahkan menghasilkan model yang sama
+if CHECKS_ENABLED:
+    ols_columns = ['const'] + ols_features + ['churn']
+    partition_gram = sum(gram_matrix(df.iloc[rows], ols_columns[1:]) for rows in np.array_split(np.arange(len(df)), 4))
+    partition_coefficients, _ = ols_from_gram(partition_gram, ols_columns, ols_features, 'churn')
+    print('\nSelisih maksimum koefisien dari gabungan partisi:', np.abs(partition_coefficients['coef'] - ols_coefficients['coef']).max())
 
 
 # %% [markdown]
@@ -984,19 +2073,202 @@ print(result.summary())
 # 
 # 
 
+# %% [markdown]
+# # ```REGRESI LOGISTIK```
+# 
+# Churn adalah variabel biner (0/1), sehingga model yang sesuai untuk faktor pendorong churn adalah regresi logistik. Model dapat memakai subset kolom numerik mana pun beserta kolom kategorikal yang di-one-hot (kategori pertama menjadi referensi).
+# 
+# - Matriks desain disimpan dalam float32 dan diproses per chunk.
+# - Setiap iterasi IRLS mengakumulasi X'WX dan X'(y - p) per chunk, lalu menyelesaikan sistem p×p dengan dekomposisi Cholesky. Alternatifnya L-BFGS untuk model dengan banyak kolom.
+# - Kolom distandarisasi secara internal agar akumulasi float32 tetap stabil. Koefisien dan standard error dikembalikan ke skala asli.
+# - Karena hanya satu chunk yang berada di memori, model yang sama dapat dilatih langsung dari CSV yang lebih besar dari RAM (`logistic_regression_csv`).
+
 # %%
-import pandas as pd
-from scipy.stats import chi2_contingency
+from scipy.linalg import cho_factor, cho_solve
+from scipy.optimize import minimize
+from scipy.special import expit
+
+def logistic_levels(df, categorical):
+    # kategori setiap kolom dibekukan agar seluruh chunk menghasilkan kolom one-hot yang sama
+    levels = {}
+    for col in categorical:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            levels[col] = list(df[col].cat.categories)
+        else:
+            levels[col] = sorted(df[col].dropna().unique().tolist())
+    return levels
+
+def logistic_feature_names(numeric, levels):
+    return ['const'] + list(numeric) + [f'{col}_{level}' for col, values in levels.items() for level in values[1:]]
+
+def logistic_design(frame, numeric, levels, target='churn', dtype=np.float32):
+    # matriks desain [const, numerik, one-hot] dan target biner; kategori yang tidak dikenal jatuh ke referensi
+    X = np.zeros((len(frame), 1 + len(numeric) + sum(len(values) - 1 for values in levels.values())), dtype=dtype)
+    X[:, 0] = 1
+    for j, col in enumerate(numeric, start=1):
+        X[:, j] = frame[col].to_numpy(dtype=dtype)
+    j = 1 + len(numeric)
+    for col, values in levels.items():
+        codes = pd.Categorical(frame[col], categories=values).codes
+        for code in range(1, len(values)):
+            X[:, j] = codes == code
+            j += 1
+    return X, frame[target].to_numpy(dtype=dtype)
+
+def logistic_pass(chunks, beta, center, scale, hessian=True):
+    # satu pemindaian data pada skala terstandarisasi: log-likelihood, gradien dan (opsional) X'WX
+    k = len(beta)
+    loglik, grad, hess = 0.0, np.zeros(k), np.zeros((k, k))
+    b = beta.astype(np.float32)
+    for X, y in chunks():
+        Z = (X - center) / scale
+        eta = (Z @ b).astype(np.float64)
+        p = expit(eta)
+        loglik += np.sum(y * eta - np.logaddexp(0, eta))
+        grad += Z.T @ (y - p).astype(np.float32)
+        if hessian:
+            w = (p * (1 - p)).astype(np.float32)
+            hess += (Z * w[:, None]).T @ Z
+    return loglik, grad, hess
+
+def logistic_fit(chunks, names, method='irls', max_iter=50, tol=1e-6, alpha=0.05):
+    # chunks: fungsi tanpa argumen yang menghasilkan pasangan (X float32, y) untuk satu pemindaian penuh
+    k = len(names)
+
+    # pemindaian awal: jumlah baris, rata-rata dan simpangan baku kolom untuk standarisasi internal
+    n, sums, sumsq, y_sum = 0, np.zeros(k), np.zeros(k), 0.0
+    for X, y in chunks():
+        n += len(X)
+        sums += X.sum(axis=0, dtype=np.float64)
+        sumsq += np.square(X, dtype=np.float64).sum(axis=0)
+        y_sum += y.sum(dtype=np.float64)
+    center = sums / n
+    scale = np.sqrt(np.maximum(sumsq / n - center ** 2, 0))
+    center[0], scale[0] = 0.0, 1.0
+    scale[scale == 0] = 1.0
+    center, scale = center.astype(np.float32), scale.astype(np.float32)
+
+    y_mean = y_sum / n
+    b = np.zeros(k)
+    b[0] = np.log(y_mean / (1 - y_mean))
+
+    converged, iterations = False, 0
+    if method == 'irls':
+        for iterations in range(max_iter + 1):
+            loglik, grad, hess = logistic_pass(chunks, b, center, scale)
+            if converged or iterations == max_iter:
+                break
+            step = cho_solve(cho_factor(hess), grad)
+            b = b + step
+            converged = np.max(np.abs(step)) < tol
+    elif method == 'lbfgs':
+        def objective(beta):
+            loglik, grad, _ = logistic_pass(chunks, beta, center, scale, hessian=False)
+            return -loglik / n, -grad / n
+        optimum = minimize(objective, b, jac=True, method='L-BFGS-B', options={'maxiter': max_iter * 10, 'gtol': tol})
+        b, converged, iterations = optimum.x, optimum.success, optimum.nit
+        loglik, grad, hess = logistic_pass(chunks, b, center, scale)
+    else:
+        raise ValueError(f"method harus 'irls' atau 'lbfgs', bukan {method!r}")
+
+    # kembali ke skala asli: beta = T b dan cov = T cov_b T'
+    T = np.diag(1 / scale.astype(np.float64))
+    T[0, 1:] = -center[1:] / scale[1:]
+    beta = T @ b
+    cov = T @ cho_solve(cho_factor(hess), np.eye(k)) @ T.T
+    se = np.sqrt(np.diag(cov))
+    z_value = beta / se
+    z_crit = norm.ppf(1 - alpha / 2)
+
+    coefficients = pd.DataFrame({'coef': beta,
+                                 'std_err': se,
+                                 'z': z_value,
+                                 'p_value': 2 * norm.sf(np.abs(z_value)),
+                                 'ci_lower': beta - z_crit * se,
+                                 'ci_upper': beta + z_crit * se}, index=names)
+
+    # log-likelihood model nol (hanya konstanta) dihitung langsung dari proporsi churn
+    ll_null = n * (y_mean * np.log(y_mean) + (1 - y_mean) * np.log(1 - y_mean))
+    llr = 2 * (loglik - ll_null)
+    summary = {'n': n,
+               'df_model': k - 1,
+               'df_resid': n - k,
+               'method': method,
+               'iterations': iterations,
+               'converged': bool(converged),
+               'log_likelihood': loglik,
+               'll_null': ll_null,
+               'pseudo_r_squared': 1 - loglik / ll_null,
+               'llr': llr,
+               'llr_p_value': chi2_distribution.sf(llr, k - 1)}
+    return coefficients, summary
+
+def logistic_regression(df, numeric=(), categorical=(), target='churn', chunksize=1_000_000, **kwargs):
+    # matriks desain float32 dibentuk sekali lalu dipindai per chunk pada setiap iterasi
+    levels = logistic_levels(df, categorical)
+    X, y = logistic_design(df, list(numeric), levels, target)
+
+    def chunks():
+        for start in range(0, len(X), chunksize):
+            yield X[start:start + chunksize], y[start:start + chunksize]
+    return logistic_fit(chunks, logistic_feature_names(numeric, levels), **kwargs)
+
+def logistic_regression_csv(path, numeric=(), categorical=(), target='churn', levels=None, chunksize=1_000_000, **kwargs):
+    # data lebih besar dari RAM: setiap iterasi membaca ulang CSV per chunk sehingga memori hanya O(chunksize·p)
+    levels = levels or {col: list(CHURN_SCHEMA[col].categories) for col in categorical}
+
+    def chunks():
+        for chunk in iter_churn_chunks(path, chunksize):
+            yield logistic_design(chunk, list(numeric), levels, target)
+    return logistic_fit(chunks, logistic_feature_names(numeric, levels), **kwargs)
+
+def format_logistic_summary(coefficients, summary):
+    # ringkasan teks setara bagian utama result.summary() milik statsmodels
+    header = pd.Series({'No. Observations': summary['n'],
+                        'Df Model': summary['df_model'],
+                        'Df Residuals': summary['df_resid'],
+                        'Method': summary['method'],
+                        'Iterations': summary['iterations'],
+                        'Converged': summary['converged'],
+                        'Pseudo R-squ.': round(summary['pseudo_r_squared'], 4),
+                        'Log-Likelihood': round(summary['log_likelihood'], 2),
+                        'LL-Null': round(summary['ll_null'], 2),
+                        'LLR p-value': summary['llr_p_value']})
+    return header.to_string() + '\n\n' + coefficients.to_string(float_format=lambda value: f'{value:.4g}')
+
+logit_numeric = ['age', 'balance', 'active_member', 'credit_score', 'products_number', 'tenure', 'estimated_salary']
+logit_categorical = ['country', 'gender']
+
+start = time.perf_counter()
+logit_coefficients, logit_summary = traced('logistic_regression', logistic_regression, df, logit_numeric, logit_categorical)
+elapsed = time.perf_counter() - start
+print(format_logistic_summary(logit_coefficients, logit_summary))
+print(f'\nWaktu fitting: {elapsed:.3f} detik ({len(df) / elapsed:,.0f} baris/detik)')
 
-# Membuat tabel kontingensi antara products_number dan churn
-contingency_table = pd.crosstab(df['products_number'], df['churn'])
+# %%
+# pengecekan (CHURN_CHECKS=1): validasi terhadap statsmodels Logit untuk model tiga variabel yang sama dengan OLS di atas
+if CHECKS_ENABLED:
+    logit_check, _ = logistic_regression(df, ['age', 'balance', 'active_member'])
+    sm_logit = sm.Logit(df['churn'].astype(float), sm.add_constant(df[['age', 'balance', 'active_member']].astype(float))).fit(disp=0)
+    print('Selisih maksimum koefisien:', np.abs(logit_check['coef'] / sm_logit.params - 1).max())
+    print('Selisih maksimum standard error:', np.abs(logit_check['std_err'] / sm_logit.bse - 1).max())
+
+# %%
+# hasil uji chi-square seluruh variabel (dihitung pada task graph dari statistik segmen)
+chi_square_results.sort_values('chi2', ascending=False)
+
+# %%
+# Mengambil tabel kontingensi antara products_number dan churn dari hasil uji batch
+contingency_table = contingency_tables['products_number']
 
 # Menampilkan tabel kontingensi
 print("Tabel Kontingensi:")
 print(contingency_table)
 
-# Menghitung chi-square
-chi2, p_value, dof, expected = chi2_contingency(contingency_table)
+# Mengambil hasil chi-square
+chi2, p_value = chi_square_results.loc['products_number', ['chi2', 'p_value']]
+dof = chi_square_results.loc['products_number', 'dof']
+expected = expected_tables['products_number'].to_numpy()
 
 # Menampilkan hasil
 print("\nChi-square value:", chi2)
@@ -1017,18 +2289,17 @@ print(expected)
 # Dengan demikian, berdasarkan nilai chi-square yang tinggi dan p-value yang sangat rendah, dan ada hubungan yang signifikan antara keduanya. Variabel `products_number` dapat menjadi prediktor yang kuat untuk memprediksi perilaku churn pelanggan.
 
 # %%
-import pandas as pd
-from scipy.stats import chi2_contingency
-
-# Membuat tabel kontingensi antara products_number dan churn
-contingency_table = pd.crosstab(df['active_member'], df['churn'])
+# Mengambil tabel kontingensi antara active_member dan churn dari hasil uji batch
+contingency_table = contingency_tables['active_member']
 
 # Menampilkan tabel kontingensi
 print("Tabel Kontingensi:")
 print(contingency_table)
 
-# Menghitung chi-square
-chi2, p_value, dof, expected = chi2_contingency(contingency_table)
+# Mengambil hasil chi-square
+chi2, p_value = chi_square_results.loc['active_member', ['chi2', 'p_value']]
+dof = chi_square_results.loc['active_member', 'dof']
+expected = expected_tables['active_member'].to_numpy()
 
 # Menampilkan hasil
 print("\nChi-square value:", chi2)
@@ -1048,18 +2319,17 @@ print(expected)
 # Dengan demikian, berdasarkan nilai chi-square yang tinggi dan p-value yang sangat rendah, ada hubungan yang signifikan antara keduanya. Variabel `active_member` dapat menjadi prediktor yang kuat untuk memprediksi perilaku churn pelanggan.
 
 # %%
-import pandas as pd
-from scipy.stats import chi2_contingency
-
-# Membuat tabel kontingensi antara products_number dan churn
-contingency_table = pd.crosstab(df['credit_card'], df['churn'])
+# Mengambil tabel kontingensi antara credit_card dan churn dari hasil uji batch
+contingency_table = contingency_tables['credit_card']
 
 # Menampilkan tabel kontingensi
 print("Tabel Kontingensi:")
 print(contingency_table)
 
-# Menghitung chi-square
-chi2, p_value, dof, expected = chi2_contingency(contingency_table)
+# Mengambil hasil chi-square
+chi2, p_value = chi_square_results.loc['credit_card', ['chi2', 'p_value']]
+dof = chi_square_results.loc['credit_card', 'dof']
+expected = expected_tables['credit_card'].to_numpy()
 
 # Menampilkan hasil
 print("\nChi-square value:", chi2)
@@ -1077,6 +2347,1196 @@ print(expected)
 #    - P-value yang cukup besar (0.4655) menunjukkan bahwa tidak cukup bukti untuk menolak hipotesis nol, yang menyatakan bahwa tidak ada hubungan antara `credit_card` dan `churn`.
 # berdasarkan hasil analisis ini, variabel `credit_card` tidak memiliki pengaruh yang signifikan terhadap kemungkinan churn pelanggan.
 
+# %% [markdown]
+# ## ```MODE STATISTIK ONLINE```
+# 
+# Batch harian pelanggan baru maupun pelanggan yang diperbarui tidak perlu diproses ulang dari awal. Statistik cukup (sufficient statistics) disimpan dan diperbarui per batch dalam waktu O(batch):
+# - jumlah pelanggan dan jumlah churn per segmen (untuk persentase churn dan tabel chi-square),
+# - matriks Gram Z'Z dari kolom numerik beserta konstanta, yang memuat jumlah, jumlah kuadrat dan perkalian silang (untuk `describe()`, korelasi, serta X'X dan X'y untuk OLS).
+# 
+# Pelanggan yang diperbarui ditangani dengan mengurangi kontribusi baris versi lama lalu menambahkan baris versi baru. Nilai min/max hanya bertambah (tidak dapat dikurangi) sehingga dapat tertinggal setelah pembaruan.
+
+# %%
+def bin_batch(batch, binning):
+    # menerapkan batas binning yang sudah dibekukan ke batch baru tanpa menghitung ulang kuantil umur
+    return apply_binning(batch.copy(), binning)
+
+def online_stats_init(moment_columns, dimensions, target='churn'):
+    columns = ['const'] + list(moment_columns)
+    return {
+        'n': 0,
+        'target': target,
+        'columns': columns,
+        'gram': np.zeros((len(columns), len(columns))),
+        'min': np.full(len(moment_columns), np.inf),
+        'max': np.full(len(moment_columns), -np.inf),
+        'dimensions': list(dimensions),
+        'segments': {dim: pd.DataFrame({'count': [], 'churn': []}, dtype=np.int64) for dim in dimensions}
+    }
+
+def online_stats_update(state, batch, sign=1):
+    # sign=1 menambahkan batch, sign=-1 mengurangi kontribusi batch (baris versi lama)
+    state['gram'] += sign * gram_matrix(batch, state['columns'][1:])
+    state['n'] += sign * len(batch)
+    if sign > 0 and len(batch):
+        state['min'] = np.minimum(state['min'], [batch[col].min() for col in state['columns'][1:]])
+        state['max'] = np.maximum(state['max'], [batch[col].max() for col in state['columns'][1:]])
+
+    stats = segment_churn_stats(batch, state['dimensions'], target=state['target'])
+    for dim in state['dimensions']:
+        state['segments'][dim] = (state['segments'][dim]
+                                  .add(sign * stats[dim][['count', 'churn']], fill_value=0)
+                                  .astype(np.int64))
+    return state
+
+def online_stats_apply_delta(state, new_rows, previous_rows=None):
+    # pelanggan yang diperbarui: versi lama dikurangi lalu versi baru ditambahkan
+    if previous_rows is not None and len(previous_rows):
+        online_stats_update(state, previous_rows, sign=-1)
+    return online_stats_update(state, new_rows)
+
+def online_describe(state):
+    n = state['n']
+    mean = state['gram'][0, 1:] / n
+    var = (np.diag(state['gram'])[1:] - n * mean ** 2) / (n - 1)
+    return pd.DataFrame({'count': float(n),
+                         'mean': mean,
+                         'std': np.sqrt(var),
+                         'min': state['min'],
+                         'max': state['max']}, index=state['columns'][1:]).T
+
+def online_correlation(state):
+    n = state['n']
+    sums = state['gram'][0, 1:]
+    cov = (state['gram'][1:, 1:] - np.outer(sums, sums) / n) / (n - 1)
+    sd = np.sqrt(np.diag(cov))
+    return pd.DataFrame(cov / np.outer(sd, sd), index=state['columns'][1:], columns=state['columns'][1:])
+
+def online_ols(state, features):
+    return ols_from_gram(state['gram'], state['columns'], features, state['target'])
+
+def online_chi_square(state, columns):
+    return chi_square_from_stats(state['segments'], columns, target=state['target'])
+
+# simulasi: data awal, lalu satu batch harian berisi pelanggan baru dan pelanggan yang diperbarui
+online_base = df.iloc[:-1000]
+new_customers = df.iloc[-1000:]
+previous_rows = online_base.iloc[:200]
+updated_rows = previous_rows.assign(active_member=1 - previous_rows['active_member'])
+
+online_state = online_stats_init(numeric_columns + ['churn'], segment_dimensions)
+online_stats_update(online_state, online_base)
+online_stats_apply_delta(online_state,
+                         bin_batch(pd.concat([new_customers, updated_rows]), binning),
+                         previous_rows=previous_rows)
+
+online_coefficients, online_summary = online_ols(online_state, ['age', 'balance', 'active_member'])
+print('R-squared online:', online_summary['r_squared'])
+
+# pengecekan (CHURN_CHECKS=1): membandingkan dengan perhitungan ulang penuh atas data akhir
+if CHECKS_ENABLED:
+    full_data = pd.concat([updated_rows, online_base.iloc[200:], new_customers])
+    full_result = sm.OLS(full_data['churn'].astype(float), sm.add_constant(full_data[['age', 'balance', 'active_member']].astype(float))).fit()
+    print('Selisih maksimum korelasi:',
+          np.abs(online_correlation(online_state) - full_data[numeric_columns + ['churn']].corr()).max().max())
+    print('Selisih maksimum koefisien OLS:', np.abs(online_coefficients['coef'] - full_result.params).max())
+    print('R-squared penuh:', full_result.rsquared)
+
+online_coefficients
+
+# %%
+# statistik deskriptif dan uji chi-square dari statistik online
+online_chi_square_results, _, _ = online_chi_square(online_state, chi_square_columns)
+
+print(online_describe(online_state))
+online_chi_square_results
+
+# %% [markdown]
+# ## ```LAPORAN GRAFIK (HEADLESS)```
+# 
+# Untuk server laporan tanpa layar, seluruh grafik dapat ditulis langsung ke file PNG/SVG memakai backend Agg (tanpa `plt.show()`). Setiap grafik dibuat dari agregat kecil (histogram, statistik segmen, irisan kubus, matriks korelasi) dan dirender paralel pada process pool. Nama file memuat hash dari agregat masukannya sehingga grafik yang datanya tidak berubah tidak dirender ulang.
+# 
+# Mode laporan hanya dijalankan jika variabel lingkungan `CHURN_REPORT=1`; eksekusi notebook biasa cukup menampilkan grafik di atas tanpa menulis file ke `reports/`.
+
+# %%
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+REPORT_ENABLED = os.environ.get('CHURN_REPORT', '') not in ('', '0')
+REPORT_DIR = os.environ.get('CHURN_REPORT_DIR', 'reports')
+
+def draw_histogram(fig, data):
+    ax = fig.subplots()
+    counts, edges = data['counts'], data['edges']
+    bars = ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color='skyblue', edgecolor='black')
+    ax.bar_label(bars, labels=[f'{int(c)}' for c in counts], padding=5)
+    ax.set_title(data['title'])
+    ax.set_xlabel(data['xlabel'])
+    ax.set_ylabel('frekuensi')
+
+def draw_churn_bars(fig, data):
+    # kiri: jumlah churn dan non-churn per kategori, kanan: presentase churn per kategori
+    ax1, ax2 = fig.subplots(nrows=1, ncols=2)
+    stats = data['stats']
+    x = np.arange(len(stats))
+    labels = [str(label) for label in stats.index]
+    width = 0.4
+    for offset, (churn, values) in zip([-width / 2, width / 2], [(0, stats['count'] - stats['churn']), (1, stats['churn'])]):
+        bars = ax1.bar(x + offset, values, width=width, label=str(churn))
+        ax1.bar_label(bars, padding=3)
+    ax1.set_xticks(x, labels)
+    ax1.legend(title='churn')
+    ax1.set_title(f"Perbandingan {data['label']} Berdasarkan Churn")
+    ax1.set_xlabel(data['label'])
+    ax1.set_ylabel('Jumlah')
+
+    bars = ax2.bar(x, stats['churn_rate'] * 100, color='skyblue')
+    ax2.bar_label(bars, fmt='%.2f%%', padding=3)
+    ax2.set_xticks(x, labels)
+    ax2.set_title(f"Presentase Churn Berdasarkan {data['label']}")
+    ax2.set_xlabel(data['label'])
+    ax2.set_ylabel('Presentase Churn (%)')
+
+def draw_heatmap(fig, data):
+    ax = fig.subplots()
+    table = data['table']
+    image = ax.imshow(table.to_numpy(dtype=np.float64), cmap='coolwarm', aspect='auto')
+    fig.colorbar(image, ax=ax)
+    ax.set_xticks(np.arange(table.shape[1]), [str(label) for label in table.columns])
+    ax.set_yticks(np.arange(table.shape[0]), [str(label) for label in table.index])
+    for (i, j), value in np.ndenumerate(table.to_numpy()):
+        ax.text(j, i, format(value, data.get('fmt', 'd')), ha='center', va='center', fontsize=9)
+    ax.set_title(data['title'])
+    ax.set_xlabel(data['xlabel'])
+    ax.set_ylabel(data['ylabel'])
+
+CHART_DRAWERS = {
+    'histogram': draw_histogram,
+    'churn_bars': draw_churn_bars,
+    'heatmap': draw_heatmap
+}
+
+def update_chart_hash(digest, value):
+    # hash berdasarkan isi nilai (bukan tipe data objek) agar agregat yang sama selalu menghasilkan hash yang sama
+    if isinstance(value, dict):
+        for key in sorted(value):
+            digest.update(str(key).encode())
+            update_chart_hash(digest, value[key])
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        update_chart_hash(digest, value.to_numpy(dtype=np.float64))
+        digest.update(repr([str(label) for label in value.index]).encode())
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr([str(label) for label in value.columns]).encode())
+    elif isinstance(value, np.ndarray):
+        digest.update(np.ascontiguousarray(value, dtype=np.float64).tobytes())
+    else:
+        digest.update(repr(value).encode())
+
+def chart_hash(spec):
+    # hash dari jenis grafik dan agregat masukannya
+    digest = hashlib.blake2b(digest_size=8)
+    update_chart_hash(digest, {'kind': spec['kind'], 'figsize': spec['figsize'], 'data': spec['data']})
+    return digest.hexdigest()
+
+def render_chart(name, spec, paths):
+    # figure Agg tanpa pyplot sehingga aman dijalankan di worker tanpa layar
+    fig = Figure(figsize=spec['figsize'])
+    FigureCanvasAgg(fig)
+    CHART_DRAWERS[spec['kind']](fig, spec['data'])
+    fig.tight_layout()
+    for path in paths:
+        fig.savefig(path)
+    return name
+
+def render_report(charts, out_dir=REPORT_DIR, formats=('png', 'svg'), max_workers=None):
+    os.makedirs(out_dir, exist_ok=True)
+    jobs, status = {}, {}
+    for name, spec in charts.items():
+        paths = [os.path.join(out_dir, f'{name}-{chart_hash(spec)}.{fmt}') for fmt in formats]
+        if all(os.path.exists(path) for path in paths):
+            status[name] = 'cache'
+        else:
+            jobs[name] = (spec, paths)
+            status[name] = 'render'
+
+    if jobs:
+        if 'fork' in multiprocessing.get_all_start_methods():
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('fork')) as pool:
+                list(pool.map(render_chart, jobs, *zip(*jobs.values())))
+        else:
+            for name, (spec, paths) in jobs.items():
+                render_chart(name, spec, paths)
+    return pd.Series(status, name='status')
+
+# agregat untuk setiap grafik
+report_charts = {}
+for column, title in [('age', 'Histogram Berdasarkan Rentang Umur Pelanggan'), ('balance', 'Histogram Berdasarkan Rentang Saldo Pelanggan')]:
+    counts, edges = np.histogram(churn_data[column], bins=10)
+    report_charts[f'histogram_{column}'] = {'kind': 'histogram', 'figsize': (10, 6),
+                                            'data': {'counts': counts, 'edges': edges, 'title': title, 'xlabel': column}}
+for dim, label in [('tenure', 'Tenure'), ('products_number', 'Produk Nomor'), ('credit_card', 'Kartu Kredit'),
+                   ('active_member', 'Member Aktif'), ('age_bins', 'Rentang Umur'), ('balance_bins', 'Rentang Pendapatan'),
+                   ('gender', 'Gender')]:
+    report_charts[f'churn_{dim}'] = {'kind': 'churn_bars', 'figsize': (18, 6),
+                                     'data': {'stats': segment_stats[dim][['count', 'churn', 'churn_rate']], 'label': label}}
+for (rows, cols), title, xlabel, ylabel in [
+        (('balance_bins', 'age_bins'), 'Jumlah Churn Berdasarkan Rentang Pendapatan dan Rentang Umur', 'Rentang Umur', 'Rentang Pendapatan'),
+        (('balance_bins', 'credit_card'), 'Jumlah Churn Berdasarkan Rentang Pendapatan dan Kartu Kredit', 'Kartu Kredit', 'Rentang Pendapatan'),
+        (('country', 'gender'), 'Jumlah Churn Berdasarkan Negara & Gender', 'Gender', 'Negara'),
+        (('credit_score_range', 'credit_card'), 'Jumlah Churn Berdasarkan Rentang Skor Kredit', 'Kartu Kredit', 'Rentang Skor Kredit')]:
+    report_charts[f'heatmap_{rows}_{cols}'] = {'kind': 'heatmap', 'figsize': (12, 8),
+                                               'data': {'table': cube_rollup(churn_cube, [rows, cols], where={'churn': 1}),
+                                                        'title': title, 'xlabel': xlabel, 'ylabel': ylabel}}
+report_charts['heatmap_korelasi'] = {'kind': 'heatmap', 'figsize': (12, 8),
+                                     'data': {'table': correlation_matrix, 'fmt': '.2f',
+                                              'title': 'Korelasi antara Variabel Numerik dan Churn', 'xlabel': '', 'ylabel': ''}}
+
+if REPORT_ENABLED:
+    start = time.perf_counter()
+    report_status = traced('render_report', render_report, report_charts)
+    print(f'{(report_status == "render").sum()} grafik dirender, {(report_status == "cache").sum()} dari cache '
+          f'dalam {time.perf_counter() - start:.2f} detik ke {REPORT_DIR}/')
+else:
+    print('Laporan grafik dilewati (jalankan dengan CHURN_REPORT=1)')
+
+# %% [markdown]
+# ## ```BOOTSTRAP DAN UJI PERMUTASI```
+# 
+# Ketidakpastian berbasis resampling untuk persentase churn per segmen, odds ratio, koefisien OLS dan uji chi-square. Tidak ada perulangan Python per resample:
+# - Persentase churn dan odds ratio hanya bergantung pada tabel jumlah (segmen x churn). Bootstrap baris setara dengan menarik ulang isi tabel dari distribusi multinomial, sehingga biayanya O(resample x segmen) berapa pun jumlah barisnya.
+# - Uji permutasi chi-square (mengacak label churn) setara dengan menarik jumlah churn per segmen dari distribusi hipergeometrik multivariat dengan total baris dan kolom tetap.
+# - Bootstrap OLS memakai bobot Poisson per baris (Poisson bootstrap). Matriks Gram setiap resample diperoleh dari satu perkalian matriks antara bobot (resample x baris) dan perkalian pasangan kolom (baris x p²), diproses per chunk baris.
+# 
+# Resample dibagi menjadi blok berukuran tetap dengan seed turunan (`SeedSequence.spawn`), lalu dijalankan paralel pada process pool. Hasilnya identik berapa pun jumlah worker yang dipakai.
+
+# %%
+_resample_state = {}
+
+def _run_resample_block(size, seed_seq):
+    fn, args = _resample_state['job']
+    return fn(size, np.random.default_rng(seed_seq), *args)
+
+def resample_blocks(fn, args, n_resamples, seed=0, max_workers=None, block_size=1000):
+    # fn(size, rng, *args) menghasilkan array dengan sumbu pertama = resample
+    sizes = [min(block_size, n_resamples - start) for start in range(0, n_resamples, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    # input diwarisi worker melalui fork sehingga array besar tidak perlu dipickle per blok
+    _resample_state['job'] = (fn, args)
+    if len(sizes) > 1 and max_workers != 1 and 'fork' in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('fork')) as pool:
+            blocks = list(pool.map(_run_resample_block, sizes, seeds))
+    else:
+        blocks = [_run_resample_block(size, seed_seq) for size, seed_seq in zip(sizes, seeds)]
+    return np.concatenate(blocks)
+
+def segment_tables(stats, columns):
+    # tabel (segmen x [non-churn, churn]) seluruh variabel digabung, beserta indeks awal segmen setiap variabel
+    tables = [stats[col][stats[col]['count'] > 0] for col in columns]
+    index = pd.concat({col: table for col, table in zip(columns, tables)}, names=['variable', 'level']).index
+    churned = np.concatenate([table['churn'].to_numpy() for table in tables]).astype(np.int64)
+    cells = np.column_stack([np.concatenate([table['count'].to_numpy() for table in tables]) - churned, churned])
+    starts = np.cumsum([0] + [len(table) for table in tables])[:-1]
+    return cells, starts, index
+
+def _bootstrap_table_block(size, rng, cells, starts):
+    # bootstrap baris = tabel jumlah ditarik ulang dari multinomial(n, proporsi sel), per variabel
+    draws = np.empty((size,) + cells.shape, dtype=np.int64)
+    for start, end in zip(starts, list(starts[1:]) + [len(cells)]):
+        block = cells[start:end]
+        draws[:, start:end] = rng.multinomial(block.sum(), (block / block.sum()).ravel(), size=size).reshape(size, end - start, 2)
+    return draws
+
+def segment_odds_ratio(count, churn, starts):
+    # odds ratio segmen dibandingkan dengan pelanggan di luar segmen (koreksi Haldane untuk sel nol) pada sumbu terakhir
+    variable = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, count.shape[-1])))
+    total_count = np.add.reduceat(count, starts, axis=-1)[..., variable]
+    total_churn = np.add.reduceat(churn, starts, axis=-1)[..., variable]
+    a = churn.astype(np.float64)
+    b = count - a
+    c = total_churn - a
+    d = (total_count - total_churn) - b
+    cells = np.stack([a, b, c, d])
+    a, b, c, d = cells + 0.5 * (cells == 0).any(axis=0)
+    return a * d / (b * c)
+
+def bootstrap_segment_stats(stats, columns, n_resamples=10000, alpha=0.05, seed=0, max_workers=None):
+    cells, starts, index = segment_tables(stats, columns)
+    draws = resample_blocks(_bootstrap_table_block, (cells, starts), n_resamples, seed, max_workers)
+    count, churn = draws.sum(axis=-1), draws[..., 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = churn / count
+    odds_ratio = segment_odds_ratio(count, churn, starts)
+
+    # selang kepercayaan persentil
+    bounds = [100 * alpha / 2, 100 * (1 - alpha / 2)]
+    rate_ci = np.nanpercentile(rate, bounds, axis=0)
+    odds_ratio_ci = np.nanpercentile(odds_ratio, bounds, axis=0)
+    count, churn = cells.sum(axis=1), cells[:, 1]
+    return pd.DataFrame({'count': count,
+                         'churn_rate': churn / count,
+                         'rate_ci_lower': rate_ci[0],
+                         'rate_ci_upper': rate_ci[1],
+                         'odds_ratio': segment_odds_ratio(count, churn, starts),
+                         'or_ci_lower': odds_ratio_ci[0],
+                         'or_ci_upper': odds_ratio_ci[1]}, index=index)
+
+def _permutation_table_block(size, rng, count, starts, churn_totals):
+    # label churn diacak = jumlah churn per segmen ditarik dari hipergeometrik multivariat dengan margin tetap
+    draws = np.empty((size, len(count)), dtype=np.int64)
+    for start, end, total in zip(starts, list(starts[1:]) + [len(count)], churn_totals):
+        draws[:, start:end] = rng.multivariate_hypergeometric(count[start:end], total, size=size)
+    return draws
+
+def chi_square_churn(count, churn, starts):
+    # chi-square Pearson (tanpa koreksi Yates) per variabel; sumbu terakhir = segmen
+    variable = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(count))))
+    expected = count * (np.add.reduceat(churn, starts, axis=-1)[..., variable] / np.add.reduceat(count, starts)[variable])
+    return np.add.reduceat((churn - expected) ** 2 * (1 / expected + 1 / (count - expected)), starts, axis=-1)
+
+def permutation_chi_square(stats, columns, n_resamples=10000, seed=0, max_workers=None):
+    cells, starts, _ = segment_tables(stats, columns)
+    count, churn = cells.sum(axis=1), cells[:, 1]
+    churn_totals = np.add.reduceat(churn, starts)
+    draws = resample_blocks(_permutation_table_block, (count, starts, churn_totals), n_resamples, seed, max_workers)
+
+    observed = chi_square_churn(count, churn, starts)
+    permuted = chi_square_churn(count, draws, starts)
+    dof = np.diff(np.append(starts, len(count))) - 1
+    return pd.DataFrame({'chi2': observed,
+                         'dof': dof,
+                         'p_value_asymptotic': chi2_distribution.sf(observed, dof),
+                         'p_value_permutation': (1 + (permuted >= observed).sum(axis=0)) / (1 + n_resamples)},
+                        index=pd.Index(columns, name='variable'))
+
+def _bootstrap_gram_block(size, rng, Z, row_chunk=8192):
+    # Gram setiap resample = bobot Poisson (resample x baris) @ perkalian pasangan kolom (baris x p(p+1)/2)
+    rows, cols = np.triu_indices(Z.shape[1])
+    upper = np.zeros((size, len(rows)))
+    for start in range(0, len(Z), row_chunk):
+        z = Z[start:start + row_chunk]
+        upper += rng.poisson(1.0, size=(size, len(z))).astype(np.float64) @ (z[:, rows] * z[:, cols])
+    gram = np.empty((size, Z.shape[1], Z.shape[1]))
+    gram[:, rows, cols] = upper
+    gram[:, cols, rows] = upper
+    return gram
+
+def bootstrap_ols(df, features, target='churn', n_resamples=1000, alpha=0.05, seed=0, max_workers=None):
+    # kolom fitur distandarisasi agar sistem p x p setiap resample terkondisi baik, lalu koefisien dikembalikan ke skala asli
+    X = df[list(features)].to_numpy(dtype=np.float64)
+    center, scale = X.mean(axis=0), X.std(axis=0)
+    Z = np.column_stack([np.ones(len(df)), (X - center) / scale, df[target].to_numpy(dtype=np.float64)])
+    gram = resample_blocks(_bootstrap_gram_block, (Z,), n_resamples, seed, max_workers)
+
+    k = len(features) + 1
+    b = np.linalg.solve(gram[:, :k, :k], gram[:, :k, k:])[..., 0]
+    coef = np.column_stack([b[:, 0] - (b[:, 1:] * center / scale).sum(axis=1), b[:, 1:] / scale])
+
+    estimate, _ = ols_sufficient(df, features, target)
+    ci = np.percentile(coef, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+    return pd.DataFrame({'coef': estimate['coef'],
+                         'std_err': estimate['std_err'],
+                         'bootstrap_se': coef.std(axis=0, ddof=1),
+                         'ci_lower': ci[0],
+                         'ci_upper': ci[1]}, index=estimate.index)
+
+start = time.perf_counter()
+segment_bootstrap = traced('bootstrap_segments', bootstrap_segment_stats, segment_stats, ['age_bins', 'products_number', 'active_member', 'country', 'gender'])
+print(f'Bootstrap segmen (10000 resample): {time.perf_counter() - start:.3f} detik')
+
+start = time.perf_counter()
+permutation_results = traced('permutation_chi_square', permutation_chi_square, segment_stats, chi_square_columns)
+print(f'Uji permutasi chi-square (10000 permutasi): {time.perf_counter() - start:.3f} detik')
+
+start = time.perf_counter()
+ols_bootstrap = traced('bootstrap_ols', bootstrap_ols, df, ols_features, n_resamples=2000)
+print(f'Bootstrap OLS (2000 resample): {time.perf_counter() - start:.3f} detik')
+
+segment_bootstrap
+
+# %%
+permutation_results
+
+# %%
+ols_bootstrap
+
+# %% [markdown]
+# ## ```BENCHMARK PIPELINE```
+# 
+# Harness untuk mengukur skala pipeline di atas pada data sintetis:
+# - **Generator data.** Baris dataset asli ditarik ulang dengan pengembalian, sehingga skema, distribusi marginal dan hubungan antar kolom sama dengan `Bank-Customer-Churn-Prediction.csv`. `customer_id` dibuat unik dan balance/estimated_salary diberi jitter kecil. CSV ditulis per chunk dan dipakai ulang jika sudah ada.
+# - **Tahap yang diukur.** Setiap tahap (load, cek null/duplikat, filter outlier, binning, agregasi, korelasi, OLS, regresi logistik, chi-square, render grafik) diukur wall time, baris/detik, puncak memori yang dialokasikan tahap tersebut (tracemalloc) dan puncak RSS proses.
+# - **Isolasi per ukuran.** Setiap ukuran data dijalankan pada proses terpisah (fork) agar pengukuran memori tidak saling memengaruhi.
+# - **Hasil.** Disimpan sebagai JSON di `benchmarks/`, dan `compare_benchmarks` menandai tahap yang melambat dibandingkan hasil sebelumnya.
+# 
+# Benchmark hanya dijalankan jika variabel lingkungan `CHURN_BENCH=1`, sehingga eksekusi notebook biasa tidak menulis file ke `benchmarks/` dan tidak bertambah lama. Ukuran data diatur dengan `CHURN_BENCHMARK_ROWS`, misalnya `10000,1000000,10000000,100000000`; default-nya 10.000 baris.
+
+# %%
+import subprocess
+import tempfile
+import tracemalloc
+
+BENCHMARK_DIR = os.environ.get('CHURN_BENCHMARK_DIR', 'benchmarks')
+BENCHMARK_ROWS = [int(n) for n in os.environ.get('CHURN_BENCHMARK_ROWS', '10000').split(',') if n.strip()]
+
+def generate_churn_frame(reference, n_rows, rng, start_id=0):
+    # bootstrap baris referensi: marginal dan korelasi antar kolom sama dengan data asli
+    sample = reference.iloc[rng.integers(0, len(reference), n_rows)].reset_index(drop=True)
+    sample['customer_id'] = np.arange(start_id, start_id + n_rows, dtype=np.int64) + 10_000_000
+    for col in ['balance', 'estimated_salary']:
+        values = sample[col].to_numpy()
+        jittered = values * rng.uniform(0.995, 1.005, n_rows)
+        sample[col] = np.clip(jittered, reference[col].min(), reference[col].max()).astype(values.dtype)
+    return sample
+
+def write_synthetic_csv(path, reference, n_rows, seed=0, chunksize=1_000_000):
+    # ditulis per chunk sehingga 100 juta baris tidak perlu berada di memori sekaligus
+    sizes = [min(chunksize, n_rows - start) for start in range(0, n_rows, chunksize)]
+    with open(path, 'w', newline='') as f:
+        for i, (size, seed_seq) in enumerate(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes)))):
+            chunk = generate_churn_frame(reference, size, np.random.default_rng(seed_seq), start_id=i * chunksize)
+            chunk.to_csv(f, header=i == 0, index=False)
+    return path
+
+def benchmark_stages(path, n_rows):
+    # daftar (nama tahap, fungsi) yang berbagi state agar setiap tahap memakai hasil tahap sebelumnya
+    state = {}
+
+    def load():
+        state['df'] = load_churn_csv(path)
+
+    def null_dup_check():
+        state['df'].isnull().sum()
+        duplicate_mask(state['df']).sum()
+
+    def outlier_filter():
+        state['df'] = remove_outliers(state['df'], CLEANING_DEFINITIONS['outlier_columns'],
+                                      rule=CLEANING_DEFINITIONS['outlier_rule'],
+                                      **outlier_rule_kwargs(CLEANING_DEFINITIONS['outlier_rule']))[0].copy()
+
+    def binning_stage():
+        apply_binning(state['df'], fit_binning(state['df']))
+
+    def aggregation():
+        state['stats'] = segment_churn_stats(state['df'], segment_dimensions, segment_pairs)
+        state['cube'] = build_churn_cube(state['df'], cube_dimensions)
+
+    def rendering():
+        charts = {f'churn_{dim}': {'kind': 'churn_bars', 'figsize': (18, 6),
+                                   'data': {'stats': state['stats'][dim][['count', 'churn', 'churn_rate']], 'label': dim}}
+                  for dim in ['age_bins', 'balance_bins', 'products_number']}
+        charts['heatmap_country_gender'] = {'kind': 'heatmap', 'figsize': (12, 8),
+                                            'data': {'table': cube_rollup(state['cube'], ['country', 'gender'], where={'churn': 1}),
+                                                     'title': 'Jumlah Churn', 'xlabel': 'gender', 'ylabel': 'country'}}
+        with tempfile.TemporaryDirectory() as out_dir:
+            render_report(charts, out_dir=out_dir, formats=('png',))
+
+    return [('load', load),
+            ('null_dup_check', null_dup_check),
+            ('outlier_filter', outlier_filter),
+            ('binning', binning_stage),
+            ('aggregation', aggregation),
+            ('correlation', lambda: association_matrix(state['df'], numeric_columns, ['country', 'gender'])),
+            ('ols', lambda: ols_sufficient(state['df'], ols_features)),
+            ('logistic', lambda: logistic_regression(state['df'], logit_numeric, logit_categorical)),
+            ('chi_square', lambda: chi_square_from_stats(state['stats'], chi_square_columns)),
+            ('rendering', rendering)]
+
+def benchmark_pipeline(path, n_rows, trace_memory=True):
+    results = {}
+    for name, fn in benchmark_stages(path, n_rows):
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        fn()
+        wall_time = time.perf_counter() - start
+        if trace_memory:
+            peak_traced = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            tracemalloc.stop()
+        results[name] = {'wall_time': wall_time,
+                         'rows_per_sec': n_rows / wall_time if wall_time > 0 else float('inf'),
+                         'peak_traced_mb': peak_traced if trace_memory else None,
+                         'peak_rss_mb': peak_rss_mb()}
+    return results
+
+def benchmark_metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': commit,
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'cpu_count': os.cpu_count()}
+
+def run_benchmarks(sizes=BENCHMARK_ROWS, out_dir=BENCHMARK_DIR, seed=0, trace_memory=True):
+    os.makedirs(out_dir, exist_ok=True)
+    reference = load_churn_csv(SOURCE_CSV).dropna().astype(CHURN_SCHEMA)
+    report = {**benchmark_metadata(), 'results': {}}
+    for n_rows in sizes:
+        path = os.path.join(out_dir, f'synthetic_{n_rows}_{seed}.csv')
+        if not os.path.exists(path):
+            write_synthetic_csv(path, reference, n_rows, seed)
+
+        # setiap ukuran pada proses baru (fork) agar puncak memori tidak terbawa dari ukuran sebelumnya
+        if 'fork' in multiprocessing.get_all_start_methods():
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('fork')) as pool:
+                report['results'][n_rows] = pool.submit(benchmark_pipeline, path, n_rows, trace_memory).result()
+        else:
+            report['results'][n_rows] = benchmark_pipeline(path, n_rows, trace_memory)
+
+    report_path = os.path.join(out_dir, f"benchmark_{report['timestamp'].replace(':', '')}.json")
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report_path
+
+def load_benchmark(path):
+    with open(path) as f:
+        report = json.load(f)
+    return pd.concat({int(n_rows): pd.DataFrame(stages).T for n_rows, stages in report['results'].items()},
+                     names=['rows', 'stage'])
+
+def compare_benchmarks(baseline_path, current_path, tolerance=0.2):
+    # tahap yang wall time-nya naik lebih dari tolerance (20%) ditandai sebagai regresi
+    baseline, current = load_benchmark(baseline_path), load_benchmark(current_path)
+    comparison = pd.DataFrame({'baseline': baseline['wall_time'], 'current': current['wall_time']}).dropna()
+    comparison['ratio'] = comparison['current'] / comparison['baseline']
+    comparison['regression'] = comparison['ratio'] > 1 + tolerance
+    return comparison
+
+if BENCHMARK_ENABLED:
+    benchmark_path = run_benchmarks()
+    print('Hasil benchmark disimpan di', benchmark_path)
+    print(load_benchmark(benchmark_path)[['wall_time', 'rows_per_sec', 'peak_traced_mb', 'peak_rss_mb']])
+else:
+    print('Benchmark dilewati (jalankan dengan CHURN_BENCH=1)')
+
+# %% [markdown]
+# ## ```PENCARIAN SEGMEN CHURN TERTINGGI```
+# 
+# Pencarian otomatis subgrup (konjungsi nilai dimensi binning dan kategori, misalnya `age_bins=9 & active_member=0 & country=Germany`) hingga kedalaman 3–4, sebagai pelengkap grafik dan heatmap yang dipilih manual di atas.
+# - **Bitset.** Setiap nilai dimensi disimpan sebagai bitset (satu bit per pelanggan, dikemas dalam uint64). Jumlah pelanggan dan churn sebuah segmen dihitung dari interseksi AND dan popcount, tanpa filter DataFrame.
+# - **Ekspansi per level.** Seluruh segmen pada satu level diperluas dengan semua nilai dimensi berikutnya dalam satu operasi array. Dimensi ditambahkan berurutan sehingga setiap konjungsi hanya dikunjungi sekali.
+# - **Pruning dengan optimistic estimate.** Untuk setiap segmen dihitung nilai kualitas tertinggi yang mungkin dicapai oleh perluasannya (jika perluasan hanya menyisakan pelanggan churn). Segmen yang estimasinya tidak melampaui kualitas top-k saat ini, atau jumlah pelanggannya di bawah `min_support`, tidak diperluas lagi.
+# 
+# Ukuran kualitas:
+# - `wracc` (default): (n/N)·(p − p0). Menyeimbangkan lift dan ukuran segmen.
+# - `binomial`: √n·(p − p0).
+# - `lift`: p/p0 dengan minimal `min_support` pelanggan.
+
+# %%
+import heapq
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(words):
+        # jumlah bit 1 sepanjang sumbu terakhir (numpy >= 2.0)
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        return _POPCOUNT_TABLE[words.view(np.uint8)].reshape(*words.shape, 8).sum(axis=(-2, -1), dtype=np.int64)
+
+def pack_bitset(mask):
+    # boolean (..., n) -> uint64 (..., ceil(n/64)); bit sisa di word terakhir bernilai 0
+    packed = np.packbits(mask, axis=-1, bitorder='little')
+    padding = -packed.shape[-1] % 8
+    if padding:
+        packed = np.concatenate([packed, np.zeros(packed.shape[:-1] + (padding,), dtype=np.uint8)], axis=-1)
+    return packed.view(np.uint64)
+
+def dimension_bitsets(df, dimensions):
+    # {dimensi: (bitset per nilai (k, words), label)}; dibangun per nilai agar tidak ada matriks boolean k x n
+    bitsets = {}
+    for col in dimensions:
+        codes, labels = encode_dimension(df[col])
+        bitsets[col] = (np.stack([pack_bitset(codes == code) for code in range(len(labels))]), labels)
+    return bitsets
+
+def subgroup_quality(count, churn, total, base_rate, measure):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = churn / count
+        if measure == 'wracc':
+            return count / total * (rate - base_rate)
+        if measure == 'binomial':
+            return np.sqrt(count) * (rate - base_rate)
+        if measure == 'lift':
+            return rate / base_rate
+    raise ValueError(f'measure tidak dikenal: {measure}')
+
+def optimistic_estimate(count, churn, total, base_rate, measure, min_support):
+    # kualitas tertinggi yang dapat dicapai perluasan segmen: sub-segmen terbaik hanya berisi pelanggan churn
+    if measure == 'wracc':
+        return churn / total * (1 - base_rate)
+    if measure == 'binomial':
+        return np.sqrt(churn) * (1 - base_rate)
+    if measure == 'lift':
+        # sub-segmen minimal min_support pelanggan: seluruh churn + sisa non-churn
+        return np.minimum(churn, np.maximum(min_support, 1)) / np.maximum(min_support, 1) / base_rate
+    raise ValueError(f'measure tidak dikenal: {measure}')
+
+def _valid_mask(n, words):
+    # bitset dengan bit 0..n-1 bernilai 1
+    return pack_bitset(np.ones(n, dtype=bool))[None, :words]
+
+def _group_by_last_dimension(batches):
+    # segmen anak dikelompokkan per dimensi terakhir agar perluasan berikutnya tetap satu operasi array per dimensi
+    groups = {}
+    for segments, children in batches:
+        last = segments[0][-1][0]
+        groups.setdefault(last, ([], []))
+        groups[last][0].extend(segments)
+        groups[last][1].append(children)
+    return [(segments, np.concatenate(children)) for segments, children in groups.values()]
+
+def discover_subgroups(df, dimensions, target='churn', max_depth=3, top_k=20, measure='wracc',
+                       min_support=50, max_block_mb=64):
+    bitsets = dimension_bitsets(df, dimensions)
+    target_bits = pack_bitset(df[target].to_numpy() == 1)
+    total, total_churn = len(df), int(popcount(target_bits))
+    base_rate = total_churn / total
+    words = target_bits.shape[-1]
+
+    # top-k sebagai min-heap (kualitas, id, segmen); threshold = kualitas terendah dalam top-k
+    top, counter = [], 0
+    evaluated = pruned = 0
+
+    def threshold():
+        return top[0][0] if len(top) >= top_k else -np.inf
+
+    # level 0: segmen kosong (seluruh pelanggan); segmen = daftar (indeks dimensi, kode nilai)
+    level = [([()], _valid_mask(total, words))]
+    for depth in range(1, max_depth + 1):
+        next_level = []
+        for segments, parents in level:
+            last = segments[0][-1][0] if segments[0] else -1
+            for dim_index in range(last + 1, len(dimensions)):
+                values, labels = bitsets[dimensions[dim_index]]
+
+                # interseksi (parent, nilai) dalam blok agar memori tetap dibatasi max_block_mb
+                block = max(1, int(max_block_mb * 1024 ** 2 // (8 * words * len(values) * 2)))
+                for start in range(0, len(parents), block):
+                    children = parents[start:start + block, None, :] & values[None, :, :]
+                    count = popcount(children)
+                    churn = popcount(children & target_bits)
+                    evaluated += count.size
+
+                    quality = subgroup_quality(count, churn, total, base_rate, measure)
+                    support_ok = count >= min_support
+                    for p, v in zip(*np.nonzero(support_ok & (quality > threshold()))):
+                        segment = segments[start + p] + ((dim_index, v),)
+                        item = (float(quality[p, v]), counter, segment, int(count[p, v]), int(churn[p, v]))
+                        counter += 1
+                        if len(top) < top_k:
+                            heapq.heappush(top, item)
+                        elif item[0] > top[0][0]:
+                            heapq.heapreplace(top, item)
+
+                    # hanya segmen yang masih mungkin masuk top-k dan cukup besar yang diperluas
+                    if depth < max_depth:
+                        optimistic = optimistic_estimate(count, churn, total, base_rate, measure, min_support)
+                        expand = support_ok & (optimistic > threshold())
+                        pruned += int(count.size - expand.sum())
+                        p_idx, v_idx = np.nonzero(expand)
+                        if len(p_idx):
+                            next_level.append(([segments[start + p] + ((dim_index, v),) for p, v in zip(p_idx, v_idx)],
+                                               children[p_idx, v_idx]))
+        level = _group_by_last_dimension(next_level)
+        if not level:
+            break
+
+    rows = []
+    for quality, _, segment, count, churn in sorted(top, reverse=True):
+        rows.append({'segment': ' & '.join(f'{dimensions[d]}={bitsets[dimensions[d]][1][v]}' for d, v in segment),
+                     'depth': len(segment),
+                     'count': count,
+                     'churn': churn,
+                     'churn_rate': churn / count,
+                     'lift': churn / count / base_rate,
+                     'support': count / total,
+                     measure: quality})
+    search = {'evaluated': evaluated, 'pruned': pruned, 'base_rate': base_rate}
+    return pd.DataFrame(rows), search
+
+start = time.perf_counter()
+churn_subgroups, subgroup_search = traced('subgroup_discovery', discover_subgroups, df, segment_dimensions,
+                                          max_depth=4, top_k=20)
+print(f"{subgroup_search['evaluated']:,} kandidat segmen dievaluasi, {subgroup_search['pruned']:,} dipangkas, "
+      f'dalam {time.perf_counter() - start:.2f} detik')
+churn_subgroups
+
+# %%
+# segmen dengan tingkat churn tertinggi (lift) dengan minimal 100 pelanggan
+churn_subgroups_lift, _ = discover_subgroups(df, segment_dimensions, max_depth=4, top_k=20, measure='lift', min_support=100)
+churn_subgroups_lift
+
+# %% [markdown]
+# ## ```BITMAP INDEX SEGMEN```
+# 
+# Filter segmen seperti `df[df['churn'] == 1]` atau `df[(df['country'] == 'Germany') & (df['active_member'] == 0)]` selalu membuat mask boolean sepanjang seluruh data dan menyalin sub-DataFrame. Untuk drill-down interaktif yang hanya membutuhkan jumlah pelanggan dan tingkat churn, setiap nilai kolom churn, kategori dan binning disimpan sebagai bitmap terkompresi bergaya roaring:
+# - **Container.** Nomor baris dibagi per blok 65.536 baris (16 bit atas). Setiap blok disimpan sebagai *array container* (daftar uint16 terurut, jika isinya ≤ 4096 baris) atau *bitmap container* (1024 word uint64).
+# - **Operasi.** AND/OR dikerjakan per container. Jumlah pelanggan segmen = popcount/panjang container hasil, tanpa membentuk sub-DataFrame.
+# 
+# Filter ditulis sebagai dict `{kolom: nilai atau list nilai}` (AND antar kolom, OR antar nilai satu kolom) atau tuple bersarang `('and' | 'or', filter, filter, ...)`.
+
+# %%
+ROARING_BLOCK = 1 << 16
+ROARING_ARRAY_MAX = 4096
+ROARING_WORDS = ROARING_BLOCK // 64
+
+def _container_from_low(low):
+    # low: nomor baris 16 bit bawah (uint16, terurut)
+    if len(low) <= ROARING_ARRAY_MAX:
+        return low.astype(np.uint16)
+    return pack_bitset(np.bincount(low, minlength=ROARING_BLOCK).astype(bool))
+
+def _container_rows(container):
+    if container.dtype == np.uint16:
+        return container
+    return np.flatnonzero(np.unpackbits(container.view(np.uint8), bitorder='little')).astype(np.uint16)
+
+def _container_bits(container):
+    if container.dtype == np.uint64:
+        return container
+    return pack_bitset(np.bincount(container, minlength=ROARING_BLOCK).astype(bool))
+
+def _container_cardinality(container):
+    return len(container) if container.dtype == np.uint16 else int(popcount(container))
+
+def _shrink_container(bits):
+    # bitmap container yang isinya tinggal sedikit dikembalikan ke array container
+    return _container_rows(bits) if _container_cardinality(bits) <= ROARING_ARRAY_MAX else bits
+
+def roaring_from_rows(rows):
+    # rows: nomor baris terurut -> {blok (16 bit atas): container}
+    rows = np.asarray(rows, dtype=np.int64)
+    high = rows >> 16
+    keys, starts = np.unique(high, return_index=True)
+    ends = np.append(starts[1:], len(rows))
+    return {int(key): _container_from_low((rows[start:end] & 0xFFFF).astype(np.uint16))
+            for key, start, end in zip(keys, starts, ends)}
+
+def roaring_rows(bitmap):
+    if not bitmap:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate([(key << 16) + _container_rows(bitmap[key]).astype(np.int64) for key in sorted(bitmap)])
+
+def roaring_cardinality(bitmap):
+    return sum(_container_cardinality(container) for container in bitmap.values())
+
+def roaring_and(a, b):
+    result = {}
+    for key in a.keys() & b.keys():
+        x, y = a[key], b[key]
+        if x.dtype == np.uint16 and y.dtype == np.uint16:
+            container = np.intersect1d(x, y, assume_unique=True)
+        elif x.dtype == np.uint16 or y.dtype == np.uint16:
+            # array & bitmap: cek bit setiap elemen array
+            rows, bits = (x, y) if x.dtype == np.uint16 else (y, x)
+            container = rows[((bits[rows >> 6] >> (rows & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)]
+        else:
+            container = _shrink_container(x & y)
+        if len(container):
+            result[key] = container
+    return result
+
+def roaring_or(a, b):
+    result = dict(a)
+    for key, y in b.items():
+        x = result.get(key)
+        if x is None:
+            result[key] = y
+        elif x.dtype == np.uint16 and y.dtype == np.uint16 and len(x) + len(y) <= ROARING_ARRAY_MAX:
+            result[key] = np.union1d(x, y)
+        else:
+            result[key] = _container_bits(x) | _container_bits(y)
+    return result
+
+def roaring_nbytes(bitmap):
+    return sum(container.nbytes for container in bitmap.values())
+
+def build_bitmap_index(df, columns):
+    # {kolom: {nilai: bitmap}}; baris dikelompokkan per kode dengan satu argsort stabil (nomor baris tetap terurut)
+    index = {}
+    positions = np.arange(len(df), dtype=np.int64)
+    for col in columns:
+        codes, labels = encode_dimension(df[col])
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+        index[col] = {label: roaring_from_rows(positions[order[bounds[code]:bounds[code + 1]]])
+                      for code, label in enumerate(labels)}
+    return index
+
+def bitmap_query(index, expr):
+    # dict: AND antar kolom, OR antar nilai; tuple: ('and' | 'or', sub-filter, ...)
+    if isinstance(expr, dict):
+        result = None
+        for col, values in expr.items():
+            values = values if isinstance(values, (list, tuple, set)) else [values]
+            column_bitmap = {}
+            for value in values:
+                column_bitmap = roaring_or(column_bitmap, index[col].get(value, {}))
+            result = column_bitmap if result is None else roaring_and(result, column_bitmap)
+        if result is None:
+            raise ValueError('filter kosong')
+        return result
+    op, *operands = expr
+    combine = {'and': roaring_and, 'or': roaring_or}[op]
+    result = bitmap_query(index, operands[0])
+    for operand in operands[1:]:
+        result = combine(result, bitmap_query(index, operand))
+    return result
+
+def bitmap_segment_stats(index, expr, by=None, target='churn'):
+    # jumlah pelanggan, churn dan tingkat churn segmen; dengan by: rincian per nilai kolom by (drill-down)
+    segment = bitmap_query(index, expr)
+    churned = index[target][1]
+    if by is None:
+        count, churn = roaring_cardinality(segment), roaring_cardinality(roaring_and(segment, churned))
+        return {'count': count, 'churn': churn, 'churn_rate': churn / count if count else float('nan')}
+    rows = []
+    for value, bitmap in index[by].items():
+        part = roaring_and(segment, bitmap)
+        rows.append((roaring_cardinality(part), roaring_cardinality(roaring_and(part, churned))))
+    count, churn = np.array(rows, dtype=np.int64).reshape(-1, 2).T
+    return segment_frame(count, churn, pd.Index(list(index[by]), name=by))
+
+bitmap_columns = ['churn', 'country', 'gender', 'active_member', 'credit_card', 'products_number', 'tenure',
+                  'age_bins', 'balance_bins', 'credit_score_range']
+
+start = time.perf_counter()
+bitmap_index = traced('bitmap_index', build_bitmap_index, df, bitmap_columns)
+bitmap_mb = sum(roaring_nbytes(bitmap) for values in bitmap_index.values() for bitmap in values.values()) / 1024 ** 2
+mask_mb = sum(len(values) for values in bitmap_index.values()) * len(df) / 1024 ** 2
+print(f'bitmap index {len(bitmap_columns)} kolom dibangun dalam {time.perf_counter() - start:.3f} detik: '
+      f'{bitmap_mb:.3f} MB (mask boolean per nilai: {mask_mb:.3f} MB)')
+
+# %%
+# contoh drill-down: pelanggan Jerman yang tidak aktif, atau pelanggan dengan 3-4 produk
+bitmap_filter = ('or', {'country': 'Germany', 'active_member': 0}, {'products_number': [3, 4]})
+print(bitmap_segment_stats(bitmap_index, bitmap_filter))
+bitmap_segment_stats(bitmap_index, bitmap_filter, by='age_bins')
+
+# %%
+# pengecekan (CHURN_CHECKS=1) terhadap filter pandas
+if CHECKS_ENABLED:
+    bitmap_check = ((df['country'] == 'Germany') & (df['active_member'] == 0)) | df['products_number'].isin([3, 4])
+    print('Selisih jumlah pelanggan:', bitmap_segment_stats(bitmap_index, bitmap_filter)['count'] - int(bitmap_check.sum()),
+          '| selisih churn:', bitmap_segment_stats(bitmap_index, bitmap_filter)['churn'] - int(df.loc[bitmap_check, 'churn'].sum()))
+
+# %% [markdown]
+# ## ```SCORING CHURN```
+# 
+# Koefisien regresi logistik dan batas binning disimpan sebagai artefak JSON (`models/churn_model.json`). Artefak ini dibaca oleh modul `churn_scoring.py` untuk:
+# - **Scoring batch seluruh pelanggan (malam hari).** Batch numpy, pandas atau Arrow di-scoring dengan satu matrix-vector product float32. Efek kategori (country, gender) diambil dari tabel lookup, sehingga kolom one-hot tidak perlu dibentuk. Perintahnya `python churn_scoring.py score data.csv scores.csv`.
+# - **Scoring on-demand dari CRM.** Endpoint HTTP lokal `POST /score` (`python churn_scoring.py serve`) menggabungkan permintaan yang masuk selama batch sebelumnya dihitung menjadi satu batch (micro-batching, maksimal 1024 pelanggan). Respons berisi probabilitas churn beserta label bin pelanggan.
+
+# %%
+import churn_scoring
+
+MODEL_PATH = churn_scoring.MODEL_PATH
+
+def save_churn_model(path, coefficients, numeric, levels, binning, summary, target='churn'):
+    # koefisien pada skala asli (bukan terstandarisasi) sehingga scoring cukup X·beta
+    artifact = {'version': churn_scoring.MODEL_VERSION,
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'target': target,
+                'numeric': list(numeric),
+                'categorical': {col: [str(level) for level in values] for col, values in levels.items()},
+                'coefficients': {name: float(coef) for name, coef in coefficients['coef'].items()},
+                'binning': binning,
+                'n': int(summary['n'])}
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(artifact, f, indent=2, default=int)
+    return path
+
+save_churn_model(MODEL_PATH, logit_coefficients, logit_numeric, logistic_levels(df, logit_categorical), binning, logit_summary)
+churn_model = churn_scoring.load_model(MODEL_PATH)
+
+# pengecekan (CHURN_CHECKS=1): probabilitas dari modul scoring harus sama dengan prediksi model hasil fitting
+if CHECKS_ENABLED:
+    churn_scores = churn_scoring.score_batch(churn_model, df)
+    X_check, _ = logistic_design(df, logit_numeric, logistic_levels(df, logit_categorical))
+    print('Selisih maksimum probabilitas:',
+          np.abs(churn_scores - expit(X_check.astype(np.float64) @ logit_coefficients['coef'].to_numpy())).max())
+
+# %%
+# throughput batch (1 juta baris) dan latensi per pelanggan melalui micro-batcher
+scoring_benchmark = churn_scoring.benchmark_scoring(churn_model, n_requests=500)
+print(f"scoring batch: {scoring_benchmark['batch_rows_per_sec']:,.0f} baris/detik | "
+      f"latensi per pelanggan p50 {scoring_benchmark['latency_p50_ms']:.3f} ms, p99 {scoring_benchmark['latency_p99_ms']:.3f} ms")
+churn_scoring.score_records(churn_model, df.head(3).to_dict('records'))
+
+# %% [markdown]
+# ## ```ANALISIS SURVIVAL TENURE```
+# 
+# Tenure adalah lama pelanggan berada dalam risiko churn. Pelanggan yang churn adalah *event* pada tenure-nya, sedangkan pelanggan yang belum churn tersensor (masih bertahan sampai tenure saat ini). Karena itu persentase churn per tenure saja tidak cukup.
+# 
+# Kurva Kaplan–Meier dan uji log-rank dihitung untuk seluruh segmen sekaligus dari matriks jumlah segmen × tenure × churn. Matriks ini adalah hasil rollup kubus churn, jadi data mentah tidak dipindai ulang.
+# - **Pelanggan berisiko** pada tenure t = jumlah pelanggan segmen − kumulatif event dan sensor sebelum t.
+# - **S(t)** = ∏(1 − d/n) dengan `cumprod` per baris segmen. Interval kepercayaan memakai Greenwood dengan transformasi log-log.
+# - **Log-rank** membandingkan event teramati dan harapan antar nilai satu dimensi (atau kombinasi dimensi).
+
+# %%
+import itertools
+
+def segment_dims(segment):
+    return [segment] if isinstance(segment, str) else list(segment)
+
+def segment_name(segment):
+    return ' & '.join(segment_dims(segment))
+
+def survival_cube(cube, dimensions):
+    # satu kali rollup kubus churn ke dimensi survival; seluruh segmen lalu diturunkan dari kubus kecil ini
+    counts = cube_rollup(cube, dimensions).to_numpy().reshape([len(cube['labels'][col]) for col in dimensions])
+    return {'dimensions': list(dimensions), 'labels': {col: cube['labels'][col] for col in dimensions}, 'counts': counts}
+
+def survival_counts(cube, segment, time='tenure', event='churn'):
+    # matriks event (churn) dan sensor (tidak churn) berukuran (jumlah nilai segmen) x (jumlah tenure)
+    dims = segment_dims(segment)
+    keep = dims + [time, event]
+    other_axes = tuple(i for i, col in enumerate(cube['dimensions']) if col not in keep)
+    kept = [col for col in cube['dimensions'] if col in keep]
+    counts = np.transpose(cube['counts'].sum(axis=other_axes), [kept.index(col) for col in keep])
+    counts = counts.reshape(-1, len(cube['labels'][time]), len(cube['labels'][event]))
+    event_axis = list(cube['labels'][event]).index(1)
+    labels = [' / '.join(map(str, value)) for value in itertools.product(*[cube['labels'][col] for col in dims])]
+    return counts[:, :, event_axis], counts.sum(axis=2) - counts[:, :, event_axis], labels
+
+def kaplan_meier(events, censored, alpha=0.05):
+    # events, censored: (segmen, waktu); seluruh segmen dihitung bersamaan
+    exits = events + censored
+    at_risk = exits.sum(axis=1, keepdims=True) - np.cumsum(exits, axis=1) + exits
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hazard = np.where(at_risk > 0, events / at_risk, 0.0)
+        survival = np.cumprod(1 - hazard, axis=1)
+
+        # Greenwood: var(log S) = Σ d / (n (n - d)); CI log-log agar tetap di (0, 1)
+        greenwood = np.cumsum(np.where(at_risk > events, events / (at_risk * (at_risk - events)), 0.0), axis=1)
+        z = norm.ppf(1 - alpha / 2)
+        spread = np.where(greenwood > 0, z * np.sqrt(greenwood) / np.abs(np.log(survival)), 0.0)
+        ci_lower = survival ** np.exp(spread)
+        ci_upper = survival ** np.exp(-spread)
+    return {'at_risk': at_risk, 'survival': survival, 'ci_lower': ci_lower, 'ci_upper': ci_upper}
+
+def log_rank_test(events, at_risk):
+    # uji log-rank k kelompok: (O - E)' V⁻¹ (O - E) atas k-1 kelompok, df = k - 1
+    total_events, total_at_risk = events.sum(axis=0), at_risk.sum(axis=0)
+    valid = total_at_risk > 1
+    d, n = total_events[valid], total_at_risk[valid]
+    share = at_risk[:, valid] / n
+    observed_minus_expected = (events[:, valid] - share * d).sum(axis=1)
+    weight = d * (n - d) / (n - 1)
+    covariance = np.einsum('t,gt,ht->gh', weight, share, share)
+    variance = np.diag((weight * share).sum(axis=1)) - covariance
+    k = len(events)
+    statistic = float(observed_minus_expected[:-1] @ np.linalg.solve(variance[:-1, :-1], observed_minus_expected[:-1]))
+    return statistic, k - 1, float(chi2_distribution.sf(statistic, k - 1))
+
+def median_survival(survival, times):
+    # tenure pertama dengan S(t) <= 0.5; NaN jika kurva tidak pernah turun sampai 50%
+    reached = survival <= 0.5
+    return np.where(reached.any(axis=1), np.asarray(times)[reached.argmax(axis=1)], np.nan)
+
+def survival_analysis(cube, segments, time='tenure', event='churn', alpha=0.05):
+    # kurva seluruh segmen ditumpuk menjadi satu matriks sehingga Kaplan–Meier dihitung sekali
+    dimensions = list(dict.fromkeys(col for segment in segments for col in segment_dims(segment)))
+    cube = survival_cube(cube, dimensions + [time, event])
+    blocks = [survival_counts(cube, segment, time, event) for segment in segments]
+    events = np.concatenate([block[0] for block in blocks])
+    censored = np.concatenate([block[1] for block in blocks])
+    index = pd.MultiIndex.from_tuples([(segment_name(segment), label) for segment, block in zip(segments, blocks)
+                                       for label in block[2]], names=['segmen', 'nilai'])
+    times = cube['labels'][time]
+    km = kaplan_meier(events, censored, alpha)
+    curves = {name: pd.DataFrame(values, index=index, columns=times) for name, values in km.items()}
+
+    # uji log-rank per segmen (nilai-nilai satu dimensi/kombinasi dibandingkan satu sama lain)
+    tests, offset = {}, 0
+    for segment, block in zip(segments, blocks):
+        rows = slice(offset, offset + len(block[2]))
+        # kombinasi nilai tanpa pelanggan tidak ikut diuji
+        present = km['at_risk'][rows, 0] > 0
+        statistic, dof, p_value = log_rank_test(events[rows][present], km['at_risk'][rows][present])
+        tests[segment_name(segment)] = {'chi2': statistic, 'df': dof, 'p_value': p_value}
+        offset += len(block[2])
+
+    summary = pd.DataFrame({'count': events.sum(axis=1) + censored.sum(axis=1),
+                            'churn': events.sum(axis=1),
+                            'survival_akhir': km['survival'][:, -1],
+                            'median_tenure': median_survival(km['survival'], times)}, index=index)
+    return curves, summary, pd.DataFrame(tests).T.astype({'df': int})
+
+survival_dimensions = ['country', 'gender', 'age_bins', 'products_number', 'active_member']
+survival_segments = survival_dimensions + [pair for pair in itertools.combinations(survival_dimensions, 2)]
+
+start = time.perf_counter()
+survival_curves, survival_summary, survival_tests = traced('survival', survival_analysis, churn_cube, survival_segments)
+print(f"{len(survival_summary)} kurva Kaplan–Meier dan {len(survival_tests)} uji log-rank dalam "
+      f'{(time.perf_counter() - start) * 1000:.1f} ms')
+print(survival_tests.loc[survival_dimensions])
+
+# %%
+import matplotlib.pyplot as plt
+
+# kurva survival tenure per kelompok usia dan status keanggotaan aktif
+fig, axes = plt.subplots(1, 2, figsize=(18, 6))
+for ax, dimension in zip(axes, ['age_bins', 'active_member']):
+    survival = survival_curves['survival'].loc[dimension]
+    for value, row in survival.iterrows():
+        ax.step(survival.columns, row.to_numpy(), where='post', label=value)
+        ax.fill_between(survival.columns, survival_curves['ci_lower'].loc[(dimension, value)],
+                        survival_curves['ci_upper'].loc[(dimension, value)], step='post', alpha=0.15)
+    ax.set_title(f"Kaplan–Meier tenure per {dimension} (log-rank p = {survival_tests.loc[dimension, 'p_value']:.2e})")
+    ax.set_xlabel('tenure')
+    ax.set_ylabel('probabilitas tidak churn')
+    ax.legend(title=dimension, ncol=2)
+plt.tight_layout()
+plt.show()
+
+# %% [markdown]
+# ## ```DEDUPLIKASI EKSTRAK BULANAN```
+# 
+# Di produksi, data berasal dari beberapa extract bulanan. Pelanggan yang sama (`customer_id`) muncul berulang kali, kadang dengan nilai kolom yang berubah. Deduplikasi dilakukan secara streaming dalam dua fase (hash partitioning):
+# 1. **Partisi.** Setiap extract dibaca per chunk. Setiap baris diberi nomor urut global dan hash 64-bit seluruh kolom, lalu ditulis ke salah satu `n_partitions` file sementara berdasarkan hash `customer_id`. Semua versi seorang pelanggan pasti berada di partisi yang sama.
+# 2. **Resolusi.** Setiap partisi dimuat sendiri-sendiri, diurutkan per (customer_id, nomor urut), lalu satu versi per pelanggan dipilih dengan kebijakan `last` (last-write-wins) atau `first` (first-seen).
+# 
+# Baris yang identik dengan versi sebelumnya dihitung sebagai duplikat persis, sedangkan versi dengan nilai berbeda dihitung sebagai perubahan. Keduanya dideteksi dari hash uint64, bukan perbandingan object. Memori yang dipakai hanya sebesar satu chunk atau satu partisi, sehingga tetap terbatas untuk ratusan juta baris (tambah `n_partitions` untuk data yang lebih besar).
+
+# %%
+import pickle
+import tempfile
+from contextlib import nullcontext
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    # tanpa pyarrow hasil ditulis dengan DataFrame.to_csv (lebih lambat)
+    pa_csv = None
+
+def key_partition(keys, n_partitions):
+    # nomor partisi dari hash kunci (bukan kunci mentah) agar customer_id berurutan tetap tersebar merata
+    return (pd.util.hash_array(np.asarray(keys)) % np.uint64(n_partitions)).astype(np.int64)
+
+def spill_partitions(paths, tmp_dir, key='customer_id', n_partitions=64, chunksize=1_000_000):
+    # fase 1: setiap potongan partisi ditambahkan (pickle berurutan) ke file partisinya
+    handles = [open(os.path.join(tmp_dir, f'part_{i:04d}.pkl'), 'wb') for i in range(n_partitions)]
+    rows_in, seq = [], 0
+    try:
+        for path in paths:
+            rows_in.append(0)
+            for chunk in iter_churn_chunks(path, chunksize):
+                chunk = chunk.reset_index(drop=True)
+                chunk['_hash'] = row_hashes(chunk)
+                chunk['_seq'] = np.arange(seq, seq + len(chunk), dtype=np.int64)
+                seq += len(chunk)
+                rows_in[-1] += len(chunk)
+
+                part = key_partition(chunk[key].to_numpy(), n_partitions)
+                order = np.argsort(part, kind='stable')
+                bounds = np.searchsorted(part[order], np.arange(n_partitions + 1))
+                for i in np.flatnonzero(np.diff(bounds)):
+                    pickle.dump(chunk.iloc[order[bounds[i]:bounds[i + 1]]], handles[i], protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        for handle in handles:
+            handle.close()
+    return rows_in
+
+def read_partition(path):
+    pieces = []
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                pieces.append(pickle.load(f))
+            except EOFError:
+                break
+    return pd.concat(pieces, ignore_index=True) if pieces else None
+
+def dedup_partition(part, key='customer_id', policy='last'):
+    # fase 2: versi setiap pelanggan diurutkan sesuai urutan extract lalu satu versi dipilih
+    part = part.sort_values([key, '_seq'], kind='stable')
+    keys = part[key].to_numpy()
+    first_version = np.r_[True, keys[1:] != keys[:-1]]
+    last_version = np.r_[keys[1:] != keys[:-1], True]
+
+    # hash baris memuat customer_id, sehingga hash yang sudah muncul = duplikat persis dari versi sebelumnya
+    exact = pd.Series(part['_hash'].to_numpy()).duplicated().to_numpy()
+    stats = {'customers': int(first_version.sum()),
+             'exact_duplicates': int(exact.sum()),
+             'changed_versions': int((~first_version & ~exact).sum())}
+    if policy == 'last':
+        kept = part[last_version]
+    elif policy == 'first':
+        kept = part[first_version]
+    else:
+        raise ValueError(f'policy tidak dikenal: {policy}')
+    return kept, stats
+
+def append_csv(frame, handle, header):
+    if pa_csv is not None:
+        pa_csv.write_csv(pa.Table.from_pandas(frame, preserve_index=False), handle, pa_csv.WriteOptions(include_header=header))
+    else:
+        frame.to_csv(handle, mode='wb', header=header, index=False)
+
+def dedup_extracts(paths, out_path=None, policy='last', key='customer_id', n_partitions=64, chunksize=1_000_000):
+    # out_path: hasil ditulis per partisi ke CSV (memori terbatas); tanpa out_path hasil dikembalikan sebagai DataFrame
+    stats = {'rows_in': 0, 'customers': 0, 'exact_duplicates': 0, 'changed_versions': 0}
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir, (open(out_path, 'wb') if out_path else nullcontext()) as out:
+        rows_in = spill_partitions(paths, tmp_dir, key, n_partitions, chunksize)
+        stats['rows_in'] = sum(rows_in)
+        for i in range(n_partitions):
+            part = read_partition(os.path.join(tmp_dir, f'part_{i:04d}.pkl'))
+            if part is None:
+                continue
+            kept, part_stats = dedup_partition(part, key, policy)
+            for name, value in part_stats.items():
+                stats[name] += value
+            if out_path is not None:
+                append_csv(kept.drop(columns=['_hash', '_seq']), out, header=not results)
+                results.append(len(kept))
+            else:
+                results.append(kept)
+    if out_path is not None:
+        return out_path, stats
+
+    # urutan baris mengikuti kemunculan versi yang dipilih
+    deduped = pd.concat(results).sort_values('_seq').drop(columns=['_hash', '_seq']).reset_index(drop=True)
+    return deduped, stats
+
+# simulasi tiga extract bulanan: sebagian pelanggan muncul lagi tanpa perubahan, sebagian dengan saldo/status berubah
+extract_base = df[list(CHURN_SCHEMA)]
+extract_2 = extract_base.iloc[3000:].copy()
+extract_2.iloc[:1500, extract_2.columns.get_loc('balance')] *= np.float32(1.01)
+extract_3 = extract_base.iloc[:1000].copy()
+extract_3.iloc[:500, extract_3.columns.get_loc('active_member')] = 1 - extract_3['active_member'].iloc[:500]
+
+with tempfile.TemporaryDirectory() as extract_dir:
+    extract_paths = []
+    for month, extract in enumerate([extract_base.iloc[:6000], extract_2, extract_3], start=1):
+        extract_paths.append(os.path.join(extract_dir, f'extract_{month:02d}.csv'))
+        extract.to_csv(extract_paths[-1], index=False)
+
+    start = time.perf_counter()
+    deduped, dedup_stats = traced('dedup_extracts', dedup_extracts, extract_paths, n_partitions=8)
+    print(f'deduplikasi {len(extract_paths)} extract dalam {time.perf_counter() - start:.3f} detik:', dedup_stats)
+
+    # pengecekan (CHURN_CHECKS=1) terhadap pandas (concat + drop_duplicates) pada data yang sama
+    if CHECKS_ENABLED:
+        merged = pd.concat([pd.read_csv(path, dtype=CHURN_SCHEMA) for path in extract_paths], ignore_index=True)
+        expected = merged.drop_duplicates('customer_id', keep='last').sort_values('customer_id').reset_index(drop=True)
+        print('Hasil sama dengan drop_duplicates:', deduped.sort_values('customer_id').reset_index(drop=True).equals(expected),
+              '| duplikat persis pandas:', int(merged.duplicated().sum()))
+
+# %%
+# ringkasan instrumentasi per tahap (hanya jika CHURN_TRACE, CHURN_TRACE_MEMORY atau CHURN_PROFILE_DIR diset)
+if TRACE_ENABLED:
+    print(trace_summary().drop(columns=['cat']))
+
 # %% [markdown]
 # # **3. Rekomendasi berdasarkan hasil analisis churn**
 
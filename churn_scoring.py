@@ -0,0 +1,289 @@
+# Scoring churn dari artefak model yang ditulis churn_bank.py (models/churn_model.json).
+#
+#   python churn_scoring.py score data.csv scores.csv   # scoring batch (malam hari) per chunk
+#   python churn_scoring.py serve --port 8080           # endpoint HTTP lokal dengan micro-batching
+#   python churn_scoring.py bench                       # throughput batch dan latensi p99 per pelanggan
+#
+# Modul ini hanya memerlukan numpy; pandas dan pyarrow dipakai jika tersedia.
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+MODEL_PATH = os.path.join(os.environ.get('CHURN_MODEL_DIR', 'models'), 'churn_model.json')
+MODEL_VERSION = 1
+
+def load_model(path=MODEL_PATH):
+    with open(path) as f:
+        artifact = json.load(f)
+    if artifact.get('version') != MODEL_VERSION:
+        raise ValueError(f"versi artefak model {artifact.get('version')} tidak didukung")
+    coefficients = artifact['coefficients']
+
+    # koefisien one-hot disimpan sebagai tabel per kategori (referensi = 0); elemen terakhir 0 untuk kategori tak dikenal (kode -1)
+    categories = {}
+    for col, levels in artifact['categorical'].items():
+        table = [0.0] + [coefficients[f'{col}_{level}'] for level in levels[1:]] + [0.0]
+        categories[col] = (levels, np.asarray(table, dtype=np.float32), {level: code for code, level in enumerate(levels)})
+
+    return {'artifact': artifact,
+            'numeric': artifact['numeric'],
+            'intercept': np.float32(coefficients['const']),
+            'weights': np.asarray([coefficients[col] for col in artifact['numeric']], dtype=np.float32),
+            'categories': categories,
+            'binning': {col: (np.asarray(spec['edges']), spec['outputs']) for col, spec in artifact['binning'].items()}}
+
+def _column(batch, name):
+    # kolom sebagai array numpy dari DataFrame, tabel/record batch Arrow, dict array atau structured array
+    if pa is not None and isinstance(batch, (pa.Table, pa.RecordBatch)):
+        column = batch.column(name)
+        return column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    if pd is not None and isinstance(batch, pd.DataFrame):
+        return batch[name].to_numpy()
+    return np.asarray(batch[name])
+
+def _num_rows(batch):
+    if isinstance(batch, dict):
+        return len(next(iter(batch.values())))
+    return batch.num_rows if pa is not None and isinstance(batch, (pa.Table, pa.RecordBatch)) else len(batch)
+
+def _category_codes(values, levels, lookup):
+    # kode 0..k-1 sesuai urutan level artefak; nilai yang tidak dikenal diberi -1
+    if pa is not None and isinstance(values, pa.Array):
+        return pc.fill_null(pc.index_in(values.cast(pa.string()), value_set=pa.array(levels)), -1).to_numpy()
+    if pd is not None and len(values) > 64:
+        return pd.Categorical(values, categories=levels).codes
+
+    # batch kecil (permintaan on-demand): lookup dict lebih cepat daripada membentuk Categorical
+    return np.fromiter((lookup.get(value, -1) for value in values), dtype=np.int64, count=len(values))
+
+def _numeric(values):
+    if pa is not None and isinstance(values, pa.Array):
+        values = values.to_numpy(zero_copy_only=False)
+    return values
+
+def score_batch(model, batch):
+    # logit = intercept + X·w (satu matrix-vector product float32) + efek kategori (lookup tabel)
+    n = _num_rows(batch)
+    X = np.empty((n, len(model['numeric'])), dtype=np.float32, order='F')
+    for j, col in enumerate(model['numeric']):
+        X[:, j] = _numeric(_column(batch, col))
+    logit = X @ model['weights']
+    logit += model['intercept']
+    for col, (levels, table, lookup) in model['categories'].items():
+        logit += table[_category_codes(_column(batch, col), levels, lookup)]
+    with np.errstate(over='ignore'):
+        return 1 / (1 + np.exp(-logit))
+
+def assign_bins(model, batch):
+    # label bin (age_bins, balance_bins, ...) memakai batas yang sama dengan analisis; di luar rentang -> None
+    result = {}
+    for col, (edges, outputs) in model['binning'].items():
+        values = np.asarray(_numeric(_column(batch, col)), dtype=np.float64)
+        codes = np.searchsorted(edges, values, side='left') - 1
+        codes[values == edges[0]] = 0
+        codes[(codes < 0) | (codes >= len(edges) - 1)] = -1
+        for name, labels in outputs.items():
+            result[name] = [labels[code] if code >= 0 else None for code in codes.tolist()]
+    return result
+
+def records_to_columns(records, model):
+    # list dict JSON -> dict array kolom yang dibutuhkan model
+    columns = dict.fromkeys(list(model['numeric']) + list(model['categories']) + list(model['binning']))
+    return {col: [record.get(col) for record in records] for col in columns} if records else {col: [] for col in columns}
+
+def validate_records(model, records):
+    # divalidasi per permintaan sebelum masuk micro-batch agar satu data rusak tidak menggagalkan permintaan lain
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        raise ValueError('pelanggan harus berupa object JSON atau list object JSON')
+    required = list(model['numeric']) + [col for col in model['binning'] if col not in model['numeric']]
+    for i, record in enumerate(records):
+        missing = [col for col in required if not isinstance(record.get(col), (int, float))]
+        if missing:
+            raise ValueError(f'pelanggan ke-{i}: kolom numerik tidak ada atau tidak valid: {missing}')
+        # kategori di luar level artefak akan diberi efek 0 secara diam-diam oleh score_batch, jadi ditolak di sini
+        for col, (levels, _, lookup) in model['categories'].items():
+            if not isinstance(record.get(col), str) or record[col] not in lookup:
+                raise ValueError(f'pelanggan ke-{i}: nilai {col} tidak dikenal: {record.get(col)!r} (pilihan: {levels})')
+    return records
+
+def score_records(model, records):
+    columns = records_to_columns(records, model)
+    numeric_columns = {col: np.asarray(columns[col], dtype=np.float32) for col in model['numeric']}
+    probabilities = score_batch(model, {**columns, **numeric_columns})
+    bins = assign_bins(model, columns)
+    return [{'customer_id': record.get('customer_id'),
+             'churn_probability': float(probability),
+             **{name: labels[i] for name, labels in bins.items()}}
+            for i, (record, probability) in enumerate(zip(records, probabilities))]
+
+def score_csv(model, path, out_path, block_size=64 << 20):
+    # scoring seluruh buku pelanggan per blok; dengan pyarrow CSV dibaca dan ditulis secara streaming
+    rows, start = 0, time.perf_counter()
+    if pa is not None:
+        reader = pa_csv.open_csv(path, read_options=pa_csv.ReadOptions(block_size=block_size))
+        writer = None
+        for batch in reader:
+            scored = pa.record_batch([batch.column('customer_id'), pa.array(score_batch(model, batch))],
+                                     names=['customer_id', 'churn_probability'])
+            if writer is None:
+                writer = pa_csv.CSVWriter(out_path, scored.schema)
+            writer.write_batch(scored)
+            rows += batch.num_rows
+        if writer is not None:
+            writer.close()
+    else:
+        for i, chunk in enumerate(pd.read_csv(path, chunksize=1_000_000)):
+            pd.DataFrame({'customer_id': chunk['customer_id'],
+                          'churn_probability': score_batch(model, chunk)}).to_csv(out_path, mode='w' if i == 0 else 'a',
+                                                                                 header=i == 0, index=False)
+            rows += len(chunk)
+    return rows, time.perf_counter() - start
+
+class MicroBatcher:
+    # permintaan yang masuk selama batch sebelumnya dihitung digabung menjadi satu batch (maks max_batch pelanggan);
+    # max_wait > 0 menunggu permintaan tambahan dengan mengorbankan latensi permintaan tunggal
+    def __init__(self, model, max_batch=1024, max_wait=0.0):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def submit(self, records):
+        future = Future()
+        self.requests.put((records, future))
+        return future
+
+    def _loop(self):
+        while True:
+            pending = [self.requests.get()]
+            size = len(pending[0][0])
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    pending.append(self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait())
+                except queue.Empty:
+                    break
+                size += len(pending[-1][0])
+
+            records = [record for request, _ in pending for record in request]
+            try:
+                scored = score_records(self.model, records)
+            except Exception as error:
+                for _, future in pending:
+                    future.set_exception(error)
+                continue
+            offset = 0
+            for request, future in pending:
+                future.set_result(scored[offset:offset + len(request)])
+                offset += len(request)
+
+def make_server(model, host='127.0.0.1', port=8080, max_batch=1024, max_wait=0.0):
+    batcher = MicroBatcher(model, max_batch, max_wait)
+
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != '/health':
+                return self._send(404, {'error': 'not found'})
+            artifact = model['artifact']
+            self._send(200, {'status': 'ok', 'created': artifact.get('created'), 'features': list(artifact['coefficients'])})
+
+        def do_POST(self):
+            # body: satu pelanggan (dict), list pelanggan, atau {"customers": [...]}
+            if self.path != '/score':
+                return self._send(404, {'error': 'not found'})
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                records = payload.get('customers', [payload]) if isinstance(payload, dict) else payload
+                self._send(200, {'scores': batcher.submit(validate_records(model, records)).result()})
+            except (ValueError, TypeError, KeyError, AttributeError) as error:
+                self._send(400, {'error': str(error)})
+            except Exception:
+                # kesalahan di sisi server: detail dicatat ke stderr, klien hanya menerima pesan umum
+                sys.stderr.write(f'{self.command} {self.path} gagal:\n{traceback.format_exc()}')
+                self._send(500, {'error': 'internal server error'})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), ScoringHandler)
+
+def benchmark_scoring(model, n_rows=1_000_000, n_requests=2000, seed=0):
+    # throughput batch pada data acak dengan rentang wajar, dan latensi per pelanggan melalui micro-batcher
+    rng = np.random.default_rng(seed)
+    batch = {col: rng.uniform(0, 100, n_rows).astype(np.float32) for col in model['numeric']}
+    for col, (levels, _, _) in model['categories'].items():
+        batch[col] = np.asarray(levels, dtype=object)[rng.integers(0, len(levels), n_rows)]
+    start = time.perf_counter()
+    score_batch(model, batch)
+    batch_time = time.perf_counter() - start
+
+    batcher = MicroBatcher(model)
+    record = {col: float(batch[col][0]) if col in model['numeric'] else batch[col][0] for col in batch}
+    latencies = []
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        batcher.submit([record]).result()
+        latencies.append(time.perf_counter() - start)
+    return {'batch_rows_per_sec': n_rows / batch_time,
+            'latency_p50_ms': float(np.percentile(latencies, 50) * 1000),
+            'latency_p99_ms': float(np.percentile(latencies, 99) * 1000)}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Scoring churn dari artefak model churn_bank.py')
+    parser.add_argument('--model', default=MODEL_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    score_parser = commands.add_parser('score')
+    score_parser.add_argument('input')
+    score_parser.add_argument('output')
+    serve_parser = commands.add_parser('serve')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8080)
+    serve_parser.add_argument('--max-batch', type=int, default=1024)
+    serve_parser.add_argument('--max-wait-ms', type=float, default=0.0)
+    commands.add_parser('bench')
+    args = parser.parse_args()
+
+    churn_model = load_model(args.model)
+    if args.command == 'score':
+        n, elapsed = score_csv(churn_model, args.input, args.output)
+        print(f'{n} pelanggan di-scoring dalam {elapsed:.2f} detik ({n / elapsed:,.0f} baris/detik)')
+    elif args.command == 'serve':
+        server = make_server(churn_model, args.host, args.port, args.max_batch, args.max_wait_ms / 1000)
+        print(f'scoring endpoint di http://{args.host}:{args.port}/score')
+        server.serve_forever()
+    else:
+        print(json.dumps(benchmark_scoring(churn_model), indent=2))